@@ -0,0 +1,99 @@
+import multiprocessing
+from collections import Counter
+
+# Number of sources searched together, one bit of a mask each
+BATCH_SIZE = 64
+
+# CompactGraph shared with forked workers, which inherit it instead of pickling it
+shared_graph = None
+
+
+def distributions(graph, sources, workers=1):
+    """
+    Yields, for every source person index in order, a dictionary with:
+    histogram: number of people at each degree of separation from the source,
+    eccentricity: the largest degree of separation of anyone it reaches,
+    unreachable: number of people it doesn't reach.
+    Sources are searched BATCH_SIZE at a time, and batches are spread over
+    workers forked processes.
+    """
+    global shared_graph
+    shared_graph = graph
+    batches = [sources[i:i + BATCH_SIZE] for i in range(0, len(sources), BATCH_SIZE)]
+
+    if workers <= 1:
+        results = map(batch_distributions, batches)
+        for batch in results:
+            yield from batch
+        return
+
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        for batch in pool.imap(batch_distributions, batches):
+            yield from batch
+
+
+def batch_distributions(sources):
+    """
+    Bit-parallel multi-source Breadth-First Search over shared_graph.
+    Every person and movie holds a bitset with bit i set once source i has
+    reached it, so one pass over the graph advances every source by a level.
+    Returns the distributions of the sources, see distributions.
+    """
+    graph = shared_graph
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_people = graph.movie_people
+    n = len(person_offsets) - 1
+
+    seen = [0] * n
+    seen_movies = [0] * (len(movie_offsets) - 1)
+
+    # Level 0: every source reaches itself
+    frontier = {}
+    for bit, source in enumerate(sources):
+        seen[source] |= 1 << bit
+        frontier[source] = frontier.get(source, 0) | 1 << bit
+    levels = [[1] for _ in sources]
+
+    while frontier:
+        # Pass the new bits of each person on to their movies, once per movie and bit
+        movie_frontier = {}
+        for person, mask in frontier.items():
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                new = mask & ~seen_movies[movie]
+                if new:
+                    seen_movies[movie] |= new
+                    movie_frontier[movie] = movie_frontier.get(movie, 0) | new
+
+        # Then from the movies to the stars that haven't got those bits yet
+        next_frontier = {}
+        for movie, mask in movie_frontier.items():
+            for person in movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                new = mask & ~seen[person]
+                if new:
+                    seen[person] |= new
+                    next_frontier[person] = next_frontier.get(person, 0) | new
+
+        # Count the people each source reached at this level, grouping equal
+        # masks so each distinct mask is split into bits only once
+        for counts in levels:
+            counts.append(0)
+        for mask, count in Counter(next_frontier.values()).items():
+            while mask:
+                low = mask & -mask
+                levels[low.bit_length() - 1][-1] += count
+                mask ^= low
+
+        frontier = next_frontier
+
+    results = []
+    for counts in levels:
+        histogram = {degree: count for degree, count in enumerate(counts) if count}
+        results.append({
+            "histogram": histogram,
+            "eccentricity": max(histogram),
+            "unreachable": n - sum(histogram.values()),
+        })
+    return results
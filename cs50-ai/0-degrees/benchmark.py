@@ -0,0 +1,152 @@
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+import degrees
+import snapshot
+from util import Node, StackFrontier, QueueFrontier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for degrees.py.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser(
+        "search", help="compare the search engines on random pairs")
+    search.add_argument("directory", nargs="?", default="large")
+    search.add_argument("--pairs", type=int, default=100)
+    search.add_argument("--compact", action="store_true")
+
+    frontier = commands.add_parser(
+        "frontier", help="push and pop nodes through the frontiers")
+    frontier.add_argument("--nodes", type=int, default=1_000_000)
+
+    memory = commands.add_parser(
+        "memory", help="compare the memory used by the dicts and the compact graph")
+    memory.add_argument("directory", nargs="?", default="large")
+
+    startup = commands.add_parser(
+        "startup", help="compare loading the CSVs with mapping the snapshot")
+    startup.add_argument("directory", nargs="?", default="large")
+
+    args = parser.parse_args()
+
+    if args.command == "search":
+        print("Loading data...")
+        degrees.load_data(args.directory, compact=args.compact)
+        print("Data loaded.")
+        compare_engines(args.pairs)
+    elif args.command == "frontier":
+        time_frontiers(args.nodes)
+    elif args.command == "memory":
+        compare_memory(args.directory)
+    elif args.command == "startup":
+        compare_startup(args.directory)
+
+
+def compare_engines(pairs, seed=50):
+    """
+    Times the one-sided and the bidirectional search on the same
+    random (source, target) pairs and checks both find paths of the same length.
+    """
+    # Use a fixed seed so every run measures the same pairs
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.person_ids())
+    queries = [tuple(rng.sample(person_ids, 2)) for _ in range(pairs)]
+
+    engines = {
+        "breadth-first": False,
+        "bidirectional": True,
+    }
+    lengths = {}
+    for engine, bidirectional in engines.items():
+        lengths[engine] = []
+        start = time.perf_counter()
+        for source, target in queries:
+            path = degrees.shortest_path(source, target, bidirectional=bidirectional)
+            lengths[engine].append(None if path is None else len(path))
+        elapsed = time.perf_counter() - start
+        print(f"{engine}: {elapsed:.3f}s total, "
+              f"{1000 * elapsed / pairs:.3f}ms per query")
+
+    # Both engines must agree on the degrees of separation of every pair
+    mismatches = sum(
+        1 for a, b in zip(lengths["breadth-first"], lengths["bidirectional"])
+        if a != b
+    )
+    print(f"{mismatches} mismatches in {pairs} pairs.")
+
+
+def time_frontiers(nodes):
+    """
+    Pushes and pops the given number of nodes through each frontier,
+    checking contains_state along the way like the searches do.
+    """
+    for frontier_class in (StackFrontier, QueueFrontier):
+        frontier = frontier_class()
+        start = time.perf_counter()
+        for state in range(nodes):
+            if not frontier.contains_state(state):
+                frontier.add(Node(state=state, parent=None, action=None, cost=1))
+        while not frontier.empty():
+            frontier.remove()
+        elapsed = time.perf_counter() - start
+        print(f"{frontier_class.__name__}: {nodes} nodes in {elapsed:.3f}s, "
+              f"{1_000_000_000 * elapsed / nodes:.0f}ns per node")
+
+
+def compare_memory(directory):
+    """
+    Loads the data as dicts and as a compact graph and reports
+    the memory each one keeps and the peak reached while loading.
+    """
+    for compact in (False, True):
+        tracemalloc.start()
+        start = time.perf_counter()
+        degrees.load_data(directory, compact=compact, cache=False)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        layout = "compact" if compact else "dicts"
+        print(f"{layout}: {current / 2**20:.1f}MiB kept, {peak / 2**20:.1f}MiB peak, "
+              f"loaded in {elapsed:.1f}s (traced)")
+
+        # Drop the loaded data before measuring the next layout
+        degrees.names.clear()
+        degrees.people.clear()
+        degrees.movies.clear()
+        degrees.graph = None
+
+
+def compare_startup(directory):
+    """
+    Times loading the data from the CSVs and from the binary snapshot.
+    """
+    loads = {
+        "csv (dicts)": dict(compact=False),
+        "csv (compact)": dict(compact=True, cache=False),
+        "snapshot (write)": dict(compact=True),
+        "snapshot (mmap)": dict(compact=True),
+    }
+    # Start from no snapshot so the first cached load has to write one
+    path = os.path.join(directory, snapshot.FILENAME)
+    if os.path.exists(path):
+        os.remove(path)
+
+    for name, options in loads.items():
+        start = time.perf_counter()
+        degrees.load_data(directory, **options)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed:.3f}s")
+
+        degrees.names.clear()
+        degrees.people.clear()
+        degrees.movies.clear()
+        degrees.graph = None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
+import argparse
 import csv
+import json
+import multiprocessing
+import os
+import socketserver
+import stat
 import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
+import analytics
+import landmarks
+import snapshot
+from graph import CompactGraph
+from loader import CsvLoad, format_bytes, paused_gc, peak_rss
+from nameindex import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,55 +26,162 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph used instead of the three dicts above when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# NameIndex of every loaded name, for prefix and fuzzy name searches,
+# see get_name_index
+name_index = None
+
+# LandmarkIndex of the compact graph, used to bound and prune searches when loaded
+landmark_index = None
+
+# The name of the game is "Six Degrees of Kevin Bacon", longer paths are not searched
+# unless a query asks for a different max_degrees
+MAX_DEGREES = 6
+
+
+def load_data(directory, compact=False, cache=True, progress=None):
     """
     Load data from CSV files into memory.
+    With compact=True the data is kept in a CompactGraph instead of dicts,
+    mapped from a snapshot of the CSVs unless cache is False.
+    Progress is written to the progress stream, if given.
+    Returns the CsvLoad of every CSV file read (none if the snapshot was used).
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+    global graph, name_index
+    loads = []
+    with paused_gc():
+        if compact:
+            if cache:
+                graph = snapshot.load_graph(directory, progress=progress, loads=loads)
             else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+                graph = CompactGraph.from_csv(directory, progress=progress, loads=loads)
+            # The graph already keeps its names sorted, so it is its own name index
+            name_index = NameIndex(graph.name_keys, graph.name_people)
+            return loads
+
+        # The movies of each person and stars of each movie, as also found
+        # in people and movies, to fill in the stars with one lookup each
+        person_movies = {}
+        movie_stars = {}
+
+        # Load people
+        load = CsvLoad(f"{directory}/people.csv", progress)
+        loads.append(load)
+        for chunk in load.chunks("id", "name", "birth"):
+            for person_id, name, birth in chunk:
+                person_movies[person_id] = movie_ids = set()
+                people[person_id] = {
+                    "name": name,
+                    "birth": birth,
+                    "movies": movie_ids
+                }
+                key = name.lower()
+                if key not in names:
+                    names[key] = {person_id}
+                else:
+                    names[key].add(person_id)
+        # Only built if names are searched
+        name_index = None
+
+        # Load movies
+        load = CsvLoad(f"{directory}/movies.csv", progress)
+        loads.append(load)
+        for chunk in load.chunks("id", "title", "year"):
+            for movie_id, title, year in chunk:
+                movie_stars[movie_id] = person_ids = set()
+                movies[movie_id] = {
+                    "title": title,
+                    "year": year,
+                    "stars": person_ids
+                }
+
+        # Load stars, counting the ones of unknown people or movies
+        load = CsvLoad(f"{directory}/stars.csv", progress)
+        loads.append(load)
+        for chunk in load.chunks("person_id", "movie_id"):
+            for person_id, movie_id in chunk:
+                try:
+                    person_movies[person_id].add(movie_id)
+                    movie_stars[movie_id].add(person_id)
+                except KeyError:
+                    load.dropped += 1
+
+    return loads
 
 
 def main():
-    # if len(sys.argv) > 2:
-    #    sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    global MAX_DEGREES
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two actors.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the data in a compact integer-indexed graph")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="with --compact, don't read or write the binary snapshot")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--batch", metavar="FILE",
+                      help="answer the source,target pairs in FILE ('-' for stdin) as JSONL")
+    mode.add_argument("--serve", metavar="[HOST:]PORT",
+                      help="answer queries over HTTP, keeping the data loaded")
+    mode.add_argument("--socket", metavar="PATH",
+                      help="answer JSON line queries on a Unix socket, keeping the data loaded")
+    mode.add_argument("--analytics", metavar="FILE",
+                      help="with --compact, write the degree distribution from every "
+                      "person id or name in FILE ('-' for stdin) to everyone as JSONL")
+    parser.add_argument("--output", metavar="FILE",
+                        help="with --batch or --analytics, write the results to FILE "
+                        "instead of stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes to spread independent queries over")
+    parser.add_argument("--landmarks", nargs="?", metavar="FILE", const="",
+                        help="with --compact, prune searches with the landmark index "
+                        f"(default: DIRECTORY/{landmarks.FILENAME}, see landmarks.py)")
+    parser.add_argument("--progress", action="store_true",
+                        help="report rows/s, peak memory and dropped rows while loading")
+    parser.add_argument("--max-degrees", type=int, default=MAX_DEGREES,
+                        help=f"longest path to search for (default: {MAX_DEGREES})")
+    parser.add_argument("--all", action="store_true",
+                        help="print every shortest path instead of just one")
+    args = parser.parse_args()
+    if args.landmarks is not None and not args.compact:
+        parser.error("--landmarks requires --compact")
+    if args.analytics and not args.compact:
+        parser.error("--analytics requires --compact")
 
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    # Every query (including the ones in forked workers) uses the new default
+    MAX_DEGREES = args.max_degrees
+
+    # Load data from files into memory, status goes to stderr when stdout is the output
+    log = sys.stderr if (args.batch or args.analytics) and not args.output else sys.stdout
+    print("Loading data...", file=log)
+    loads = load_data(args.directory, compact=args.compact, cache=args.cache,
+                      progress=log if args.progress else None)
+    print("Data loaded.", file=log)
+    if args.progress:
+        for load in loads:
+            print(load.summary(), file=log)
+        print(f"Peak RSS: {format_bytes(peak_rss())}", file=log)
+    if args.landmarks is not None:
+        path = args.landmarks or os.path.join(args.directory, landmarks.FILENAME)
+        if not load_landmarks(path):
+            sys.exit(f"No landmark index for this data at {path}, "
+                     "build one with landmarks.py.")
+
+    if args.batch:
+        run_batch(args.batch, args.output, args.workers)
+        return
+    if args.analytics:
+        run_analytics(args.analytics, args.output, args.workers)
+        return
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        serve_http(host or "127.0.0.1", int(port), args.workers)
+        return
+    if args.socket:
+        serve_socket(args.socket, args.workers)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,27 +190,424 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.all:
+        paths = all_shortest_paths(source, target)
+    else:
+        path = shortest_path(source, target)
+        paths = [] if path is None else [path]
 
-    if path is None:
+    connected = False
+    for path in paths:
+        if not connected:
+            print(f"{len(path)} degrees of separation.")
+            connected = True
+        else:
+            print()
+        print_path(source, path)
+    if not connected:
         print("Not connected.")
+
+
+def print_path(source, path):
+    """
+    Prints who starred with whom in which movie along a path.
+    """
+    degrees = len(path)
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = get_person(path[i][1])["name"]
+        person2 = get_person(path[i + 1][1])["name"]
+        movie = get_movie(path[i + 1][0])["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def run_batch(filename, output, workers):
+    """
+    Answers every source,target pair of a CSV file (or stdin when filename is "-")
+    and writes one JSON result per line to output (or stdout).
+    """
+    source_file = sys.stdin if filename == "-" else open(filename, encoding="utf-8", newline="")
+    output_file = sys.stdout if output is None else open(output, "w", encoding="utf-8")
+    try:
+        pairs = (row[:2] for row in csv.reader(source_file) if len(row) >= 2)
+        for result in answer_queries(pairs, workers):
+            output_file.write(json.dumps(result) + "\n")
+    finally:
+        if source_file is not sys.stdin:
+            source_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+def run_analytics(filename, output, workers):
+    """
+    Writes the degree distribution of every person id or name in a file
+    (or stdin when filename is "-"), one per line, as JSONL to output (or stdout).
+    """
+    source_file = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    try:
+        sources = [line.strip() for line in source_file if line.strip()]
+    finally:
+        if source_file is not sys.stdin:
+            source_file.close()
+
+    # Resolve everyone first, so a typo doesn't waste a whole batch of searches
+    try:
+        person_ids = [resolve_person(source) for source in sources]
+    except LookupError as error:
+        sys.exit(error.args[0])
+
+    output_file = sys.stdout if output is None else open(output, "w", encoding="utf-8")
+    try:
+        for result in degree_distributions(person_ids, workers):
+            output_file.write(json.dumps(result) + "\n")
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+def degree_distributions(person_ids, workers=1):
+    """
+    Yields, for every person_id, a dictionary with its histogram of degrees of
+    separation to everyone else, its eccentricity (largest degree to anyone it
+    reaches) and the number of people it doesn't reach.
+    Needs the compact graph, see analytics.distributions.
+    """
+    sources = [graph.person_index(person_id) for person_id in person_ids]
+    results = analytics.distributions(graph, sources, workers)
+    for person_id, result in zip(person_ids, results):
+        yield {"source": person_id, **result}
+
+
+def answer_queries(pairs, workers=1):
+    """
+    Yields the answer_query result of every (source, target) pair, in order.
+    With more than one worker the pairs are spread over a pool of forked
+    processes, which share the loaded data read-only instead of loading it again.
+    """
+    if workers <= 1:
+        yield from map(answer_query, pairs)
+        return
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        yield from pool.imap(answer_query, pairs, chunksize=16)
+
+
+def answer_query(pair):
+    """
+    Finds the shortest path between a (source, target) pair of person ids or names.
+    Returns a dictionary with the path as [movie_id, person_id] pairs and its degrees,
+    or with an error if a person can't be resolved.
+    """
+    source, target = (value.strip() for value in pair)
+    result = {"source": source, "target": target}
+    try:
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+    except LookupError as error:
+        result["error"] = error.args[0]
+        return result
+
+    path = shortest_path(source_id, target_id)
+    result["path"] = None if path is None else [list(step) for step in path]
+    result["degrees"] = None if path is None else len(path)
+    return result
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for a value that is either a person_id or a unique name.
+    Raises LookupError if there is no such person or the name is ambiguous.
+    """
+    try:
+        get_person(value)
+        return value
+    except KeyError:
+        pass
+
+    person_ids = person_ids_for_name(value)
+    if len(person_ids) == 0:
+        suggestions = [get_person(person_id)["name"]
+                       for _, person_id in fuzzy_names(value, limit=3)]
+        if suggestions:
+            raise LookupError(f"Person not found: {value} "
+                              f"(did you mean {', '.join(suggestions)}?)")
+        raise LookupError(f"Person not found: {value}")
+    if len(person_ids) > 1:
+        raise LookupError(f"Ambiguous name: {value} ({', '.join(person_ids)})")
+    return person_ids[0]
+
+
+class QueryServer():
+    """
+    Shared behaviour of the HTTP and Unix socket servers:
+    queries run in the server thread or on a pool of forked workers.
+    """
+    daemon_threads = True
+
+    def start_pool(self, workers):
+        # The pool is forked before the server starts any thread
+        self.pool = None
+        if workers > 1:
+            self.pool = multiprocessing.get_context("fork").Pool(workers)
+
+    def answer(self, pair):
+        if self.pool is None:
+            return answer_query(pair)
+        return self.pool.apply(answer_query, (pair,))
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.terminate()
+
+
+class HTTPQueryServer(QueryServer, ThreadingHTTPServer):
+    pass
+
+
+class UnixQueryServer(QueryServer, socketserver.ThreadingUnixStreamServer):
+    pass
+
+
+def answer_names(request):
+    """
+    Answers a {"prefix": ...} or {"fuzzy": ..., "max_distance": ...} name search
+    (with an optional "limit") with a dictionary listing the matching people.
+    """
+    limit = int(request.get("limit", 10))
+    if "prefix" in request:
+        matches = [(None, person_id)
+                   for person_id in search_names(request["prefix"], limit)]
+    elif "fuzzy" in request:
+        max_distance = int(request.get("max_distance", 2))
+        matches = fuzzy_names(request["fuzzy"], max_distance, limit)
+    else:
+        raise KeyError("prefix")
+
+    people = []
+    for distance, person_id in matches:
+        person = {"person_id": person_id, **get_person(person_id)}
+        person.pop("movies", None)
+        if distance is not None:
+            person["distance"] = distance
+        people.append(person)
+    return {"people": people}
+
+
+class HTTPQueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /path?source=...&target=... with the JSON result of answer_query
+    and GET /names?prefix=... or /names?fuzzy=... with the one of answer_names.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/path":
+            if "source" not in query or "target" not in query:
+                self.send_json(400, {"error": "Expected source and target parameters"})
+            else:
+                pair = (query["source"], query["target"])
+                self.send_json(200, self.server.answer(pair))
+        elif url.path == "/names":
+            try:
+                self.send_json(200, answer_names(query))
+            except (KeyError, ValueError):
+                self.send_json(400, {"error": "Expected a prefix or fuzzy parameter"})
+        else:
+            self.send_json(404, {"error": f"Unknown path: {url.path}"})
+
+    def send_json(self, status, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class SocketQueryHandler(socketserver.StreamRequestHandler):
+    """
+    Answers every {"source": ..., "target": ...} JSON line
+    with the JSON line result of answer_query, and every {"prefix": ...}
+    or {"fuzzy": ...} one with the result of answer_names.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                check_request(request)
+                if "source" in request:
+                    result = self.server.answer((request["source"], request["target"]))
+                else:
+                    result = answer_names(request)
+            except (ValueError, KeyError, TypeError):
+                result = {"error": "Expected a JSON object with source and target, "
+                                   "prefix or fuzzy"}
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+
+
+def check_request(request):
+    """
+    Raises ValueError unless request is a JSON object whose names are strings,
+    so that a malformed query gets an error line instead of ending the connection.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+    for field in ("source", "target", "prefix", "fuzzy"):
+        if field in request and not isinstance(request[field], str):
+            raise ValueError(f"{field} must be a string")
+
+
+def serve_http(host, port, workers):
+    """
+    Answers queries over HTTP until interrupted.
+    """
+    server = HTTPQueryServer((host, port), HTTPQueryHandler, bind_and_activate=False)
+    server.start_pool(workers)
+    run_server(server, f"http://{host}:{port}/path?source=...&target=...")
+
+
+def serve_socket(path, workers):
+    """
+    Answers queries on a Unix socket until interrupted.
+    """
+    # A server that was killed leaves its socket behind, which bind refuses
+    remove_socket(path)
+    server = UnixQueryServer(path, SocketQueryHandler, bind_and_activate=False)
+    server.start_pool(workers)
+    try:
+        run_server(server, f"unix socket {path}")
+    finally:
+        remove_socket(path)
+
+
+def remove_socket(path):
+    """
+    Removes the file at path if it is a Unix socket.
+    """
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def run_server(server, address):
+    with server:
+        server.server_bind()
+        server.server_activate()
+        print(f"Listening on {address}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def shortest_path(source, target, bidirectional=True, max_degrees=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+    If no possible path of at most max_degrees (default MAX_DEGREES), returns None.
+    The source and target being the same person also returns None, whichever
+    search is used, as there is no path of movies between them.
+    """
+    if graph is None:
+        if bidirectional:
+            return bidirectional_search(source, target, max_degrees=max_degrees)
+        return breadth_first_search(source, target, max_degrees=max_degrees)
+
+    # Search over integer indices and translate the path back to ids
+    source = graph.person_index(source)
+    target = graph.person_index(target)
+    if bidirectional:
+        path = bidirectional_search(source, target, neighbors=graph.neighbors,
+                                    index=landmark_index, max_degrees=max_degrees)
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        path = breadth_first_search(source, target, neighbors=graph.neighbors,
+                                    max_degrees=max_degrees)
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def all_shortest_paths(source, target, max_degrees=None):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target, as long as it has at most
+    max_degrees (default MAX_DEGREES). Yields nothing if there is no such path,
+    or if the source and target are the same person, like shortest_path.
+    """
+    if graph is None:
+        yield from layered_search(source, target, max_degrees=max_degrees)
+        return
+
+    paths = layered_search(graph.person_index(source), graph.person_index(target),
+                           neighbors=graph.neighbors, max_degrees=max_degrees)
+    for path in paths:
+        yield [(graph.movie_ids[movie], graph.person_ids[person])
+               for movie, person in path]
 
 
-def shortest_path(source, target):
+def layered_search(source, target, neighbors=None, max_degrees=None):
     """
+    Breadth-First Search one whole layer at a time, remembering every
+    (movie_id, person_id) link from the previous layer that reaches a person,
+    instead of a single parent. Then lazily yields every shortest path by
+    walking those links back from the target.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if max_degrees is None:
+        max_degrees = MAX_DEGREES
+    if source == target:
+        return
+
+    # Maps each reached person_id to every link it was reached through
+    parents = {source: []}
+    layer = [source]
+    for _ in range(max_degrees):
+        next_layer = {}
+        for person_id in layer:
+            for movie_id, neighbor in neighbors(person_id):
+                # People in earlier layers can't be on a shortest path through here
+                if neighbor in parents:
+                    continue
+                next_layer.setdefault(neighbor, []).append((movie_id, person_id))
+        parents.update(next_layer)
+        if target in next_layer or not next_layer:
+            break
+        layer = next_layer
+
+    if target not in parents:
+        return
+
+    # Depth-first walk back from the target, every link leads to the source
+    stack = [(target, ())]
+    while stack:
+        person_id, path = stack.pop()
+        links = parents[person_id]
+        if not links:
+            yield list(path)
+            continue
+        for movie_id, parent in reversed(links):
+            stack.append((parent, ((movie_id, person_id),) + path))
+
+
+def breadth_first_search(source, target, neighbors=None, max_degrees=None):
+    """
+    One-sided Breadth-First Search from the source to the target.
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
     If no possible path, returns None.
+    neighbors defaults to neighbors_for_person.
     """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if max_degrees is None:
+        max_degrees = MAX_DEGREES
 
     # Initialize frontier to the starting position (source)
     start = Node(state=source, parent=None, action=None, cost=1)
@@ -114,12 +632,10 @@ def shortest_path(source, target):
         explored.add(node.state)
 
         # The name of the game is "Six Degrees of Kevin Bacon" therefore we'll stablish
-        # a limit of Six Degrees
-        # We could also make this more interactive requesting as input a number of degrees which
-        # would be ideal to use with Depth-First Search
-        if node.cost <= 6:
+        # a limit of Six Degrees, unless the query asks for a different one
+        if node.cost <= max_degrees:
             # Add neighbors to the frontier
-            for action, state in neighbors_for_person(node.state):
+            for action, state in neighbors(node.state):
                 if not frontier.contains_state(state) and state not in explored:
                     child = Node(state=state, parent=node,
                                  action=action, cost=(node.cost + 1))
@@ -136,37 +652,218 @@ def shortest_path(source, target):
                     frontier.add(child)
 
 
+def bidirectional_search(source, target, neighbors=None, index=None, max_degrees=None):
+    """
+    Bidirectional Breadth-First Search: grows one frontier from the source
+    and one from the target, one layer at a time, and stops when they meet.
+    Returns the same path format as breadth_first_search.
+    With a LandmarkIndex, people that can't be on a short enough path
+    are not expanded.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if max_degrees is None:
+        max_degrees = MAX_DEGREES
+    # Like breadth_first_search, a person isn't connected to themselves
+    if source == target:
+        return None
+
+    # No path can be longer than the upper bound, and none is shorter than
+    # the lower bound, so give up early if that is already past the limit
+    limit = max_degrees
+    skip_forward = skip_backward = None
+    if index is not None:
+        lower, upper = index.bounds(source, target)
+        if lower > limit:
+            return None
+        limit = min(limit, upper)
+
+        # A person at some depth is only worth expanding if the rest
+        # of the way to the other end can still fit within the limit
+        to_target = index.lower_bounds_to(target)
+        to_source = index.lower_bounds_to(source)
+
+        def skip_forward(person, depth):
+            return depth + to_target(person) > limit
+
+        def skip_backward(person, depth):
+            return depth + to_source(person) > limit
+
+    # Map each reached person_id to (movie_id, linked person_id, depth), where the
+    # linked person is the one the search came from on that side
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # Every expansion adds one edge to the longest path the two sides can form,
+    # so the search stops after limit layers, just like the one-sided search
+    for _ in range(limit):
+        if not forward_frontier or not backward_frontier:
+            return None
+
+        # Always grow the smaller frontier, that is what keeps both sides shallow
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward, neighbors, skip_forward)
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward, neighbors, skip_backward)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, reached, other, neighbors, skip=None):
+    """
+    Expands a whole layer of one side of the bidirectional search.
+    Returns the next layer and the person_id where the shortest meeting
+    with the other side happened (None if the sides didn't meet).
+    People for which skip(person_id, depth) is true are not expanded.
+    """
+    next_frontier = []
+    meeting = None
+    meeting_length = None
+
+    for person_id in frontier:
+        if skip is not None and skip(person_id, reached[person_id][2]):
+            continue
+        depth = reached[person_id][2] + 1
+        for movie_id, neighbor in neighbors(person_id):
+            if neighbor in reached:
+                continue
+            reached[neighbor] = (movie_id, person_id, depth)
+            next_frontier.append(neighbor)
+
+            # Keep looking through the layer, a later meeting could be shorter
+            if neighbor in other:
+                length = depth + other[neighbor][2]
+                if meeting is None or length < meeting_length:
+                    meeting = neighbor
+                    meeting_length = length
+
+    return next_frontier, meeting
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through the person_id where
+    both sides of the bidirectional search met.
+    """
+    # Walk back from the meeting point to the source
+    path = []
+    person_id = meeting
+    while forward[person_id][1] is not None:
+        movie_id, previous, _ = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous
+    path.reverse()
+
+    # Walk forward from the meeting point to the target
+    person_id = meeting
+    while backward[person_id][1] is not None:
+        movie_id, following, _ = backward[person_id]
+        path.append((movie_id, following))
+        person_id = following
+
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
-        return None
+        # Offer the closest names instead of failing on a typo
+        person_ids = [person_id for _, person_id in fuzzy_names(name)]
+        if len(person_ids) == 0:
+            return None
+        print(f"No '{name}', did you mean one of these?")
+        return choose_person(person_ids)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        return choose_person(person_ids)
     else:
         return person_ids[0]
 
 
+def choose_person(person_ids):
+    """
+    Lists some people and asks for the id of the intended one.
+    Returns None if the answer is not one of them.
+    """
+    for person_id in person_ids:
+        person = get_person(person_id)
+        name = person["name"]
+        birth = person["birth"]
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def person_ids_for_name(name):
+    """
+    Returns the list of person_ids with a name, ignoring case.
+    """
+    if graph is None:
+        return sorted(names.get(name.lower(), set()))
+    return [graph.person_ids[i] for i in get_name_index().exact(name)]
+
+
+def get_name_index():
+    """
+    Returns the NameIndex of every loaded name. The compact graph's comes
+    with it, the one of the dicts is built the first time it is needed.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex.from_names(
+            (person["name"], person_id) for person_id, person in people.items())
+    return name_index
+
+
+def search_names(prefix, limit=10):
+    """
+    Returns up to limit person_ids whose name starts with prefix, ignoring case.
+    """
+    return [index_person_id(person) for person in get_name_index().prefix(prefix, limit)]
+
+
+def fuzzy_names(name, max_distance=2, limit=10):
+    """
+    Returns up to limit (distance, person_id) pairs for the people whose name is
+    within max_distance edits of name, ignoring case, closest first.
+    """
+    return [(distance, index_person_id(person))
+            for distance, person in get_name_index().fuzzy(name, max_distance, limit)]
+
+
+def index_person_id(person):
+    """
+    Returns the person_id of a person as stored in the name index,
+    which is an index into the compact graph when there is one.
+    """
+    return person if graph is None else graph.person_ids[person]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in graph.neighbors(graph.person_index(person_id))}
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -175,5 +872,52 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def load_landmarks(path):
+    """
+    Loads the landmark index at path for the compact graph.
+    Returns False if there is no index at path or it was built for other data.
+    """
+    global landmark_index
+    landmark_index = landmarks.LandmarkIndex.load(path, graph)
+    return landmark_index is not None
+
+
+def distance_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two person_ids from the landmark index, without searching.
+    """
+    return landmark_index.bounds(graph.person_index(source), graph.person_index(target))
+
+
+def get_person(person_id):
+    """
+    Returns a dictionary with the name and birth of a person.
+    """
+    if graph is None:
+        return people[person_id]
+    i = graph.person_index(person_id)
+    return {"name": graph.person_names[i], "birth": graph.person_births[i]}
+
+
+def get_movie(movie_id):
+    """
+    Returns a dictionary with the title and year of a movie.
+    """
+    if graph is None:
+        return movies[movie_id]
+    i = graph.movie_index(movie_id)
+    return {"title": graph.movie_titles[i], "year": graph.movie_years[i]}
+
+
+def person_ids():
+    """
+    Returns a list of every loaded person_id.
+    """
+    if graph is None:
+        return list(people)
+    return list(graph.person_ids)
+
+
 if __name__ == "__main__":
     main()
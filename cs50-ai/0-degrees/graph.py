@@ -0,0 +1,208 @@
+from array import array
+from bisect import bisect_left
+
+from loader import CsvLoad
+
+
+class StringTable():
+    """
+    Read-only sequence of strings kept as a single UTF-8 buffer
+    and an array of offsets into it, instead of one Python object per string.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        """
+        Builds a table from an iterable of strings, keeping their order.
+        """
+        data = bytearray()
+        offsets = array("q", [0])
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return cls(bytes(data), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class CompactGraph():
+    """
+    Co-star graph with people and movies interned to dense integer indices.
+    People and movies are both sorted by their IMDB id, so an id is found
+    with a binary search, and the stars relation is kept in both directions as
+    CSR (compressed sparse row) offset + index arrays.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 name_keys, name_people):
+        # Person i has id person_ids[i], name person_names[i]...
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+
+        # ...and movie j has id movie_ids[j], title movie_titles[j]...
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+
+        # Person i starred in person_movies[person_offsets[i]:person_offsets[i + 1]]
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+
+        # Movie j starred movie_people[movie_offsets[j]:movie_offsets[j + 1]]
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Lowercased names in sorted order and the person each one belongs to
+        self.name_keys = name_keys
+        self.name_people = name_people
+
+    @classmethod
+    def from_csv(cls, directory, progress=None, loads=None):
+        """
+        Builds the graph from the people.csv, movies.csv and stars.csv
+        files in a directory. Progress is written to the progress stream,
+        and the CsvLoad of each file appended to loads, if given.
+        """
+        if loads is None:
+            loads = []
+
+        # Load people and movies, sorted by id
+        load = CsvLoad(f"{directory}/people.csv", progress)
+        loads.append(load)
+        people = sorted(row for chunk in load.chunks("id", "name", "birth")
+                        for row in chunk)
+        load = CsvLoad(f"{directory}/movies.csv", progress)
+        loads.append(load)
+        movies = sorted(row for chunk in load.chunks("id", "title", "year")
+                        for row in chunk)
+
+        # Temporary maps from ids to indices, only needed while reading stars
+        person_index = {row[0]: i for i, row in enumerate(people)}
+        movie_index = {row[0]: i for i, row in enumerate(movies)}
+
+        # Load stars as two parallel arrays of indices, counting unknown ids
+        star_people = array("i")
+        star_movies = array("i")
+        load = CsvLoad(f"{directory}/stars.csv", progress)
+        loads.append(load)
+        for chunk in load.chunks("person_id", "movie_id"):
+            for person_id, movie_id in chunk:
+                try:
+                    person = person_index[person_id]
+                    movie = movie_index[movie_id]
+                except KeyError:
+                    load.dropped += 1
+                    continue
+                star_people.append(person)
+                star_movies.append(movie)
+        del person_index, movie_index
+
+        person_offsets, person_movies = build_csr(
+            star_people, star_movies, len(people))
+        del star_people, star_movies
+        movie_offsets, movie_people = transpose_csr(
+            person_offsets, person_movies, len(movies))
+
+        # Sort people by lowercased name for name lookups
+        name_order = sorted(range(len(people)), key=lambda i: people[i][1].lower())
+
+        return cls(
+            person_ids=StringTable.from_strings(row[0] for row in people),
+            person_names=StringTable.from_strings(row[1] for row in people),
+            person_births=StringTable.from_strings(row[2] for row in people),
+            movie_ids=StringTable.from_strings(row[0] for row in movies),
+            movie_titles=StringTable.from_strings(row[1] for row in movies),
+            movie_years=StringTable.from_strings(row[2] for row in movies),
+            person_offsets=person_offsets,
+            person_movies=person_movies,
+            movie_offsets=movie_offsets,
+            movie_people=movie_people,
+            name_keys=StringTable.from_strings(
+                people[i][1].lower() for i in name_order),
+            name_people=array("i", name_order),
+        )
+
+    def person_index(self, person_id):
+        """
+        Returns the index of a person_id, raises KeyError if it is unknown.
+        """
+        i = bisect_left(self.person_ids, person_id)
+        if i == len(self.person_ids) or self.person_ids[i] != person_id:
+            raise KeyError(person_id)
+        return i
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of a movie_id, raises KeyError if it is unknown.
+        """
+        i = bisect_left(self.movie_ids, movie_id)
+        if i == len(self.movie_ids) or self.movie_ids[i] != movie_id:
+            raise KeyError(movie_id)
+        return i
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for the people
+        who starred with a given person index.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        person_movies = self.person_movies
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for other in movie_people[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                yield movie, other
+
+
+def build_csr(rows, columns, n_rows):
+    """
+    Groups (row, column) pairs by row with a counting sort.
+    Returns (offsets, indices) arrays, with the columns of each row sorted
+    and without duplicates.
+    """
+    # Count the entries of each row, then turn the counts into start offsets
+    counts = [0] * (n_rows + 1)
+    for row in rows:
+        counts[row + 1] += 1
+    for i in range(n_rows):
+        counts[i + 1] += counts[i]
+
+    # Place every column in the next free slot of its row
+    indices = array("i", bytes(4 * len(rows)))
+    slots = counts[:-1]
+    for row, column in zip(rows, columns):
+        indices[slots[row]] = column
+        slots[row] += 1
+
+    # Sort each row and drop repeated entries (stars.csv may list a pair twice)
+    offsets = array("q", [0])
+    unique = array("i")
+    for i in range(n_rows):
+        unique.extend(sorted(set(indices[counts[i]:counts[i + 1]])))
+        offsets.append(len(unique))
+    return offsets, unique
+
+
+def transpose_csr(offsets, indices, n_columns):
+    """
+    Returns the (offsets, indices) arrays of the transpose of a CSR matrix.
+    """
+    rows = array("i")
+    for i in range(len(offsets) - 1):
+        rows.extend([i] * (offsets[i + 1] - offsets[i]))
+    return build_csr(indices, rows, n_columns)
@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import heapq
+import os
+import struct
+from array import array
+
+import snapshot
+
+# Bump whenever the layout of the index file changes
+VERSION = 1
+
+MAGIC = b"DEGLMRK\0"
+
+# Name of the index file written next to the CSVs
+FILENAME = "degrees.landmarks"
+
+# Distance stored for people a landmark can't reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    Breadth-First Search distances from a few landmark people to everyone else.
+    By the triangle inequality they bound the distance between any two people:
+    |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t) for every landmark L.
+    """
+
+    def __init__(self, graph_hash, landmarks, distances):
+        self.graph_hash = graph_hash
+        # Person indices of the landmarks, distances[i] is the array of landmark i
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Builds the index of a CompactGraph using its count best connected people.
+        """
+        landmarks = top_people(graph, count)
+        distances = [breadth_first_distances(graph, person) for person in landmarks]
+        return cls(content_hash(graph), array("i", landmarks), distances)
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+        Loads the index saved at path.
+        Returns None if it doesn't exist or was built for a different graph.
+        """
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                version, count, n = struct.unpack("<IIQ", f.read(16))
+                graph_hash = f.read(32)
+                if version != VERSION or graph_hash != content_hash(graph):
+                    return None
+                landmarks = array("i")
+                landmarks.frombytes(f.read(4 * count))
+                distances = []
+                for _ in range(count):
+                    distances.append(array("B", f.read(n)))
+        except (OSError, struct.error, ValueError):
+            return None
+        if any(len(row) != n for row in distances):
+            return None
+        return cls(graph_hash, landmarks, distances)
+
+    def save(self, path):
+        """
+        Saves the index to path.
+        """
+        n = len(self.distances[0]) if self.distances else 0
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<IIQ", VERSION, len(self.landmarks), n))
+            f.write(self.graph_hash)
+            f.write(array("i", self.landmarks).tobytes())
+            for row in self.distances:
+                f.write(row)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two person indices.
+        lower is infinite if they are not connected, upper is infinite if
+        no landmark reaches them.
+        """
+        lower = 0
+        upper = float("inf")
+        for row in self.distances:
+            a = row[source]
+            b = row[target]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            if a == UNREACHABLE or b == UNREACHABLE:
+                # One of them is in the landmark's component and the other isn't
+                return float("inf"), float("inf")
+            lower = max(lower, abs(a - b))
+            upper = min(upper, a + b)
+        return lower, upper
+
+    def lower_bounds_to(self, goal):
+        """
+        Returns a function giving the lower bound on the distance between
+        any person index and goal, with the goal's distances looked up once.
+        """
+        # Landmarks that don't reach the goal tell nothing about it, and a person
+        # a landmark can't reach gets a bound of about UNREACHABLE from the others
+        columns = [(row, row[goal]) for row in self.distances
+                   if row[goal] != UNREACHABLE]
+
+        def lower_bound(person):
+            return max((abs(row[person] - distance) for row, distance in columns),
+                       default=0)
+
+        return lower_bound
+
+
+def top_people(graph, count):
+    """
+    Returns the indices of the count people with the most co-star links,
+    counting a co-star once per shared movie.
+    """
+    offsets = graph.person_offsets
+    movie_offsets = graph.movie_offsets
+    movies = graph.person_movies
+
+    def degree(person):
+        return sum(movie_offsets[movie + 1] - movie_offsets[movie]
+                   for movie in movies[offsets[person]:offsets[person + 1]])
+
+    return heapq.nlargest(count, range(len(offsets) - 1), key=degree)
+
+
+def breadth_first_distances(graph, source):
+    """
+    Returns an array with the number of degrees of separation between a person
+    index and every person, or UNREACHABLE.
+    Every movie is expanded once: reaching it reaches all of its stars.
+    """
+    n = len(graph.person_offsets) - 1
+    distances = array("B", [UNREACHABLE]) * n
+    seen_movies = bytearray(len(graph.movie_offsets) - 1)
+    distances[source] = 0
+
+    frontier = [source]
+    depth = 0
+    while frontier and depth < UNREACHABLE - 1:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for k in range(graph.person_offsets[person], graph.person_offsets[person + 1]):
+                movie = graph.person_movies[k]
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                start, end = graph.movie_offsets[movie], graph.movie_offsets[movie + 1]
+                for other in graph.movie_people[start:end]:
+                    if distances[other] == UNREACHABLE:
+                        distances[other] = depth
+                        next_frontier.append(other)
+        frontier = next_frontier
+    return distances
+
+
+def content_hash(graph):
+    """
+    Returns a SHA-256 digest of the people, movies and stars of a graph,
+    so an index is never used with data it wasn't built from.
+    """
+    digest = hashlib.sha256()
+    for table in (graph.person_ids, graph.movie_ids):
+        digest.update(table.offsets)
+        digest.update(table.data)
+    for buffer in (graph.person_offsets, graph.person_movies):
+        digest.update(buffer)
+    return digest.digest()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the landmark distance index of a degrees data directory.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks (default: 16)")
+    parser.add_argument("--output", metavar="FILE",
+                        help=f"where to save the index (default: DIRECTORY/{FILENAME})")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    graph = snapshot.load_graph(args.directory)
+    print("Data loaded.")
+
+    print(f"Building index with {args.count} landmarks...")
+    index = LandmarkIndex.build(graph, args.count)
+    path = args.output or os.path.join(args.directory, FILENAME)
+    index.save(path)
+    print(f"Index saved to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import contextlib
+import csv
+import gc
+import itertools
+import operator
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak memory is just not reported there
+    resource = None
+
+# Number of rows parsed and handed over at a time
+CHUNK_SIZE = 100_000
+
+
+class CsvLoad():
+    """
+    Reads one CSV file in chunks of rows with the plain csv.reader,
+    picking columns by index, and keeps count of what it has read.
+    Progress is written to the progress stream after every chunk, if given.
+    """
+
+    def __init__(self, path, progress=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.rows = 0
+        # Rows the caller couldn't use, e.g. stars of unknown people or movies
+        self.dropped = 0
+        self.start = None
+        self.end = None
+
+    def chunks(self, *columns):
+        """
+        Yields lists of tuples with the given columns of every row.
+        """
+        self.start = time.perf_counter()
+        with open(self.path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            indices = [header.index(column) for column in columns]
+            if len(indices) == 1:
+                getter = lambda row, i=indices[0]: (row[i],)
+            else:
+                getter = operator.itemgetter(*indices)
+
+            while True:
+                rows = list(itertools.islice(reader, self.chunk_size))
+                if not rows:
+                    break
+                # Skip blank lines, like csv.DictReader does
+                chunk = list(map(getter, filter(None, rows)))
+                self.rows += len(chunk)
+                yield chunk
+                self.report()
+        self.end = time.perf_counter()
+
+    def elapsed(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start if self.start is not None else 0.0
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        if self.progress is not None:
+            print(f"{self.name}: {self.rows:,} rows, {self.rate():,.0f} rows/s, "
+                  f"peak RSS {format_bytes(peak_rss())}", file=self.progress)
+
+    def summary(self):
+        """
+        Returns a one line summary of the whole load.
+        """
+        summary = (f"{self.name}: {self.rows:,} rows in {self.elapsed():.2f}s "
+                   f"({self.rate():,.0f} rows/s)")
+        if self.dropped:
+            summary += f", {self.dropped:,} dropped"
+        return summary
+
+
+@contextlib.contextmanager
+def paused_gc():
+    """
+    Turns the cyclic garbage collector off while loading, since everything
+    loaded is kept but would be scanned over and over as it grows.
+    The collector is turned back on afterwards if it was on before.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the process in bytes, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(size):
+    if size is None:
+        return "unknown"
+    return f"{size / 2**20:,.1f}MiB"
@@ -0,0 +1,140 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import CompactGraph, StringTable
+
+# Bump whenever the layout of the file or of CompactGraph changes
+VERSION = 1
+
+MAGIC = b"DEGSNAP\0"
+
+# Name of the snapshot file written next to the CSVs
+FILENAME = "degrees.snapshot"
+
+# CompactGraph attributes saved in the snapshot, by kind
+STRING_TABLES = ("person_ids", "person_names", "person_births",
+                 "movie_ids", "movie_titles", "movie_years", "name_keys")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people",
+          "name_people")
+
+# The CSVs a snapshot is built from
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def load_graph(directory, progress=None, loads=None):
+    """
+    Returns the CompactGraph of a directory, mapped from its snapshot
+    when the snapshot is up to date and built from the CSVs otherwise,
+    in which case a new snapshot is written for the next run.
+    progress and loads are passed on to CompactGraph.from_csv.
+    """
+    path = os.path.join(directory, FILENAME)
+    key = source_key(directory)
+
+    graph = read(path, key)
+    if graph is None:
+        graph = CompactGraph.from_csv(directory, progress=progress, loads=loads)
+        try:
+            write(path, key, graph)
+        except OSError:
+            # A read-only data directory just means no cache
+            pass
+    return graph
+
+
+def source_key(directory):
+    """
+    Returns what a snapshot must match to be up to date: the snapshot version,
+    the byte order, and the modification time and size of every CSV.
+    """
+    key = {"version": VERSION, "byteorder": sys.byteorder, "sources": {}}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        key["sources"][name] = [stat.st_mtime_ns, stat.st_size]
+    return key
+
+
+def write(path, key, graph):
+    """
+    Writes a graph to path, together with the key it was built for.
+    The file is written under a temporary name and then renamed,
+    so readers never see a partial snapshot.
+    """
+    # Collect the buffers to save: two (data, offsets) per string table
+    buffers = []
+    for name in STRING_TABLES:
+        table = getattr(graph, name)
+        buffers.append((f"{name}.data", "B", memoryview(table.data)))
+        buffers.append((f"{name}.offsets", "q", memoryview(table.offsets)))
+    for name in ARRAYS:
+        array = memoryview(getattr(graph, name))
+        buffers.append((name, array.format, array))
+
+    # Lay the buffers out one after another, each aligned to 8 bytes
+    sections = {}
+    offset = 0
+    for name, typecode, buffer in buffers:
+        sections[name] = [typecode, offset, buffer.nbytes]
+        offset = align(offset + buffer.nbytes)
+    header = json.dumps({"key": key, "sections": sections}).encode("utf-8")
+    start = align(len(MAGIC) + 8 + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(bytes(start - f.tell()))
+            for name, _, buffer in buffers:
+                f.write(bytes(start + sections[name][1] - f.tell()))
+                f.write(buffer.cast("B"))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read(path, key):
+    """
+    Maps the snapshot at path into memory and returns its CompactGraph,
+    or None if there is no snapshot, it doesn't match key or it is corrupt.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length, = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length))
+            if header["key"] != key:
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Every array is a zero-copy view into the mapped file
+        start = align(len(MAGIC) + 8 + length)
+        view = memoryview(buffer)
+        arrays = {}
+        for name, (typecode, offset, size) in header["sections"].items():
+            section = view[start + offset:start + offset + size]
+            if section.nbytes != size:
+                # The file was cut short
+                return None
+            arrays[name] = section.cast(typecode)
+
+        fields = {name: arrays[name] for name in ARRAYS}
+        for name in STRING_TABLES:
+            fields[name] = StringTable(arrays[f"{name}.data"], arrays[f"{name}.offsets"])
+    except (OSError, ValueError, TypeError, KeyError, struct.error):
+        # A corrupt snapshot is rebuilt like a stale one
+        return None
+    return CompactGraph(**fields)
+
+
+def align(offset):
+    """
+    Rounds offset up to a multiple of 8.
+    """
+    return (offset + 7) // 8 * 8
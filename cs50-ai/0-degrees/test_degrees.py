@@ -0,0 +1,91 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import degrees
+import landmarks
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+@pytest.fixture(params=["dicts", "compact"])
+def small(request):
+    """Loads the small dataset into dicts or into a compact graph."""
+    degrees.load_data(SMALL, compact=request.param == "compact", cache=False)
+    yield request.param
+    degrees.graph = None
+
+
+def test_a_person_is_not_connected_to_themselves(small):
+    kevin_bacon = "102"
+    assert degrees.shortest_path(kevin_bacon, kevin_bacon) is None
+    assert degrees.shortest_path(kevin_bacon, kevin_bacon, bidirectional=False) is None
+    assert list(degrees.all_shortest_paths(kevin_bacon, kevin_bacon)) == []
+
+
+def test_engines_agree_on_every_pair(small):
+    people = sorted(degrees.people) if small == "dicts" else list(degrees.graph.person_ids)
+    for source in people:
+        for target in people:
+            path = degrees.shortest_path(source, target)
+            one_sided = degrees.shortest_path(source, target, bidirectional=False)
+            assert (path is None) == (one_sided is None)
+            if path is not None:
+                assert len(path) == len(one_sided)
+                assert path[-1][1] == target
+
+
+def test_socket_answers_malformed_lines_with_errors(tmp_path):
+    degrees.load_data(SMALL)
+    path = str(tmp_path / "degrees.sock")
+    server = degrees.UnixQueryServer(path, degrees.SocketQueryHandler)
+    server.start_pool(1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        lines = [
+            {"source": 5, "target": "Tom Hanks"},
+            {"prefix": 5},
+            [1],
+            "Kevin Bacon",
+            {"source": "Kevin Bacon"},
+            {"fuzzy": "kevin bakon", "limit": "many"},
+            {"source": "Kevin Bacon", "target": "Tom Hanks"},
+        ]
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(path)
+            client.sendall(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+            client.shutdown(socket.SHUT_WR)
+            answers = [json.loads(line) for line in client.makefile("rb")]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert len(answers) == len(lines)
+    assert all("error" in answer for answer in answers[:-1])
+    assert answers[-1]["degrees"] == 1
+
+
+@pytest.mark.parametrize("count", [1, 3, 16])
+def test_landmark_pruning_keeps_shortest_paths(count):
+    degrees.load_data(SMALL, compact=True, cache=False)
+    graph = degrees.graph
+    degrees.graph = None
+    index = landmarks.LandmarkIndex.build(graph, count=count)
+    people = range(len(graph.person_ids))
+    for max_degrees in (1, 2, 3, degrees.MAX_DEGREES):
+        for source in people:
+            for target in people:
+                unpruned = degrees.bidirectional_search(
+                    source, target, neighbors=graph.neighbors, max_degrees=max_degrees)
+                pruned = degrees.bidirectional_search(
+                    source, target, neighbors=graph.neighbors, index=index,
+                    max_degrees=max_degrees)
+                assert (pruned is None) == (unpruned is None), (source, target, max_degrees)
+                if pruned is not None:
+                    assert len(pruned) == len(unpruned)
+                    assert pruned[-1][1] == target
@@ -0,0 +1,37 @@
+import random
+
+from nameindex import NameIndex
+
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        previous, row = row, [i]
+        for j, cb in enumerate(b, 1):
+            row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (ca != cb)))
+    return row[-1]
+
+
+def test_prefix_and_exact():
+    index = NameIndex.from_names([("Tom Hanks", "1"), ("Tom Cruise", "2"),
+                                  ("tom hanks", "3"), ("Kevin Bacon", "4")])
+    assert sorted(index.exact("TOM HANKS")) == ["1", "3"]
+    assert index.prefix("tom", limit=10) == ["2", "1", "3"]
+    assert index.prefix("tom", limit=1) == ["2"]
+    assert index.prefix("x") == []
+
+
+def test_fuzzy_matches_every_name_within_the_distance():
+    rng = random.Random(0)
+    for _ in range(300):
+        alphabet = "abc d"[:rng.randint(2, 5)]
+        names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 7)))
+                 for _ in range(rng.randint(1, 60))]
+        index = NameIndex.from_names((name, i) for i, name in enumerate(names))
+        for _ in range(10):
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+            max_distance = rng.randint(0, 3)
+            expected = sorted((levenshtein(query, name), name, i) for i, name in enumerate(names)
+                              if levenshtein(query, name) <= max_distance)
+            found = index.fuzzy(query, max_distance, limit=len(names))
+            assert found == [(distance, i) for distance, _, i in expected]
@@ -0,0 +1,65 @@
+import mmap
+import os
+import shutil
+
+import pytest
+
+import snapshot
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    """A copy of the small dataset, without a snapshot."""
+    for name in snapshot.SOURCES:
+        shutil.copy(os.path.join(SMALL, name), tmp_path)
+    return str(tmp_path)
+
+
+def is_mapped(graph):
+    """Checks if the graph's arrays are views into a mapped snapshot."""
+    return all(isinstance(getattr(graph, name), memoryview)
+               and isinstance(getattr(graph, name).obj, mmap.mmap)
+               for name in snapshot.ARRAYS)
+
+
+def test_second_load_maps_the_snapshot(directory):
+    built = snapshot.load_graph(directory)
+    assert not is_mapped(built)
+    assert os.path.exists(os.path.join(directory, snapshot.FILENAME))
+
+    mapped = snapshot.load_graph(directory)
+    assert is_mapped(mapped)
+    assert list(mapped.person_ids) == list(built.person_ids)
+    assert list(mapped.movie_people) == list(built.movie_people)
+
+
+def test_stale_snapshot_is_rebuilt(directory):
+    snapshot.load_graph(directory)
+    path = os.path.join(directory, snapshot.FILENAME)
+    stars = os.path.join(directory, "stars.csv")
+    stat = os.stat(stars)
+    os.utime(stars, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    key = snapshot.source_key(directory)
+    assert snapshot.read(path, key) is None
+    assert not is_mapped(snapshot.load_graph(directory))
+    # The rebuild wrote a snapshot for the new key
+    assert snapshot.read(path, key) is not None
+
+
+@pytest.mark.parametrize("keep", [0.5, 0.9])
+def test_truncated_snapshot_is_rebuilt(directory, keep):
+    built = snapshot.load_graph(directory)
+    path = os.path.join(directory, snapshot.FILENAME)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        # Odd sizes leave sections that aren't a whole number of items
+        f.truncate(int(size * keep) | 1)
+
+    assert snapshot.read(path, snapshot.source_key(directory)) is None
+    rebuilt = snapshot.load_graph(directory)
+    assert not is_mapped(rebuilt)
+    assert list(rebuilt.person_ids) == list(built.person_ids)
+    assert is_mapped(snapshot.load_graph(directory))
@@ -1,4 +1,9 @@
+from collections import deque
+
+
 class Node():
+    __slots__ = ("action", "state", "parent", "cost")
+
     def __init__(self, state, parent, action, cost):
         self.action = action
         self.state = state
@@ -8,13 +13,17 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state, so that
+        # contains_state is a hash lookup instead of a scan
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -23,16 +32,23 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
 
 class QueueFrontier(StackFrontier):
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
             return node
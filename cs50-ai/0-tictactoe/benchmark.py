@@ -0,0 +1,64 @@
+import time
+
+import bitboard
+import book
+import tictactoe as ttt
+
+
+def main():
+    compare_representations()
+    compare_engines()
+
+
+def count_nodes(game, state):
+    """
+    Walks the whole game tree below a state with a representation's
+    terminal, actions and result functions, returns the number of nodes.
+    """
+    if game.terminal(state):
+        return 1
+    return 1 + sum(count_nodes(game, game.result(state, action))
+                   for action in game.actions(state))
+
+
+def compare_representations():
+    """
+    Times a full game tree walk with the list of lists board and the bitboard.
+    """
+    # Start after one move each, the full tree of the list board takes too long
+    board = ttt.result(ttt.result(ttt.initial_state(), (1, 1)), (0, 0))
+    states = {
+        "list board": (ttt, board),
+        "bitboard": (bitboard, bitboard.from_board(board)),
+    }
+    for name, (game, state) in states.items():
+        start = time.perf_counter()
+        nodes = count_nodes(game, state)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {nodes} nodes in {elapsed:.3f}s, "
+              f"{nodes / elapsed:,.0f} nodes/s")
+
+
+def compare_engines():
+    """
+    Times the first move of a game with each minimax engine,
+    the bitboard engine again once its transposition table is warm,
+    and a lookup in the opening book.
+    """
+    engines = {
+        "plain minimax": lambda: ttt.minimax(ttt.initial_state(), memoized=False),
+        "alpha-beta (cold)": lambda: bitboard.minimax(bitboard.initial_state()),
+        "alpha-beta (warm)": lambda: bitboard.minimax(bitboard.initial_state()),
+        "opening book": lambda: book.lookup(opening_book, bitboard.initial_state())[0],
+    }
+    opening_book = book.build()
+    bitboard.transpositions.clear()
+    for name, engine in engines.items():
+        start = time.perf_counter()
+        action = engine()
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {action} in {1000 * elapsed:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
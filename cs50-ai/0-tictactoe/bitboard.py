@@ -0,0 +1,259 @@
+"""
+Tic Tac Toe on bitboards
+"""
+
+import math
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# A state is a pair of 9-bit ints (x, o), bit 3 * i + j set if the player has (i, j)
+FULL = 0b111111111
+
+# Rows, columns and diagonals as bit masks
+WIN_MASKS = [0b000000111, 0b000111000, 0b111000000,
+             0b001001001, 0b010010010, 0b100100100,
+             0b100010001, 0b001010100]
+
+# WINS[bits] is 1 if the cells in bits contain a whole line, for every 9-bit value
+WINS = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+# The 8 symmetries of the board (rotations and reflections) as cell permutations:
+# cell i of a board is cell symmetry[i] of the transformed board
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+]
+
+# SYMMETRY_TABLES[s][bits] is bits transformed by symmetry s, for every 9-bit value
+SYMMETRY_TABLES = [
+    [sum(1 << symmetry[i] for i in range(9) if bits >> i & 1) for bits in range(FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
+# Flags of the values in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Transposition table of the alpha-beta engine, shared by every move of every game:
+# maps canonical keys (see canonical) to (value, flag)
+transpositions = {}
+
+# Nodes searched and transposition table hits of the current minimax call
+nodes = 0
+cache_hits = 0
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = state
+    free = ~(x | o) & FULL
+    return {divmod(i, 3) for i in range(9) if free >> i & 1}
+
+
+def result(state, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = state
+    bit = 1 << (3 * action[0] + action[1])
+    if (x | o) & bit:
+        raise ValueError
+    if x.bit_count() == o.bit_count():
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return bool(WINS[x] or WINS[o] or (x | o) == FULL)
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def from_board(board):
+    """
+    Returns the state of a list of lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list of lists board of a state.
+    """
+    x, o = state
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(X if x & bit else O if o & bit else EMPTY)
+        board.append(row)
+    return board
+
+
+def canonical(x, o):
+    """
+    Returns one int for a board and all of its symmetric boards,
+    so that they share a transposition table entry.
+    """
+    return min(table[x] << 9 | table[o] for table in SYMMETRY_TABLES)
+
+
+def minimax(state, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
+    If stats is a dictionary, the nodes searched and transposition table
+    hits (cache_hits) are stored in it.
+    """
+    global nodes, cache_hits
+    x, o = state
+    if WINS[x] or WINS[o] or (x | o) == FULL:
+        return None
+    nodes = cache_hits = 0
+
+    x_to_move = x.bit_count() == o.bit_count()
+    alpha = -math.inf
+    beta = math.inf
+    best = None
+
+    # Lowest cell first, so that the same board always gets the same answer
+    free = ~(x | o) & FULL
+    while free:
+        bit = free & -free
+        free ^= bit
+        if x_to_move:
+            value = alphabeta(x | bit, o, False, alpha, beta)
+            if value > alpha:
+                alpha = value
+                best = bit
+        else:
+            value = alphabeta(x, o | bit, True, alpha, beta)
+            if value < beta:
+                beta = value
+                best = bit
+
+        # Nobody can do better than winning
+        if alpha >= 1 or beta <= -1:
+            break
+
+    if stats is not None:
+        stats.update(nodes=nodes, cache_hits=cache_hits)
+    return divmod(best.bit_length() - 1, 3)
+
+
+def alphabeta(x, o, x_to_move, alpha, beta):
+    """
+    Returns the minimax value of a board if it is between alpha and beta,
+    otherwise a bound on the side of the window it is on.
+    """
+    global nodes, cache_hits
+    nodes += 1
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    free = ~(x | o) & FULL
+    if not free:
+        return 0
+
+    # A stored value answers the search if it is exact or its bound is outside the window
+    key = canonical(x, o)
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, flag = entry
+        if (flag == EXACT or (flag == LOWER and value >= beta)
+                or (flag == UPPER and value <= alpha)):
+            cache_hits += 1
+            return value
+
+    original_alpha = alpha
+    original_beta = beta
+
+    if x_to_move:
+        value = -2
+        while free:
+            bit = free & -free
+            free ^= bit
+            value = max(value, alphabeta(x | bit, o, False, alpha, beta))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = 2
+        while free:
+            bit = free & -free
+            free ^= bit
+            value = min(value, alphabeta(x, o | bit, True, alpha, beta))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    # A value outside the window it was searched with is only a bound
+    if value <= original_alpha:
+        transpositions[key] = (value, UPPER)
+    elif value >= original_beta:
+        transpositions[key] = (value, LOWER)
+    else:
+        transpositions[key] = (value, EXACT)
+    return value
@@ -0,0 +1,171 @@
+"""
+Solved table of every reachable Tic Tac Toe position
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+import bitboard
+
+# Bump whenever the layout of the book file changes
+VERSION = 1
+
+MAGIC = b"TTTBOOK\0"
+
+# Where the book is saved by default, next to this file
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe.book")
+
+
+def build():
+    """
+    Solves every reachable non terminal position, up to symmetry.
+    Returns a dictionary mapping canonical keys (see canonical_symmetry) to
+    (cell, value): the first cell, in row-major order of the canonical board,
+    of an optimal move, and the minimax value of the position.
+    """
+    solved = {}
+    values = {}
+
+    def solve(x, o):
+        # Returns the minimax value of a position, solving everything below it
+        if bitboard.terminal((x, o)):
+            return bitboard.utility((x, o))
+        key, symmetry = canonical_symmetry(x, o)
+        if key in values:
+            return values[key]
+
+        x_to_move = x.bit_count() == o.bit_count()
+        free = ~(x | o) & bitboard.FULL
+        children = []
+        for i in range(9):
+            bit = 1 << i
+            if free & bit:
+                child = (x | bit, o) if x_to_move else (x, o | bit)
+                children.append((i, solve(*child)))
+
+        # Same semantics as minimax: X maximizes and O minimizes
+        value = (max if x_to_move else min)(value for _, value in children)
+        best = min(bitboard.SYMMETRIES[symmetry][i]
+                   for i, child_value in children if child_value == value)
+        values[key] = value
+        solved[key] = (best, value)
+        return value
+
+    solve(0, 0)
+    return solved
+
+
+def canonical_symmetry(x, o):
+    """
+    Returns (key, symmetry): the canonical key of a position (the same for all
+    its symmetric positions) and the index of the symmetry that turns the
+    position into the canonical one.
+    """
+    return min((table[x] << 9 | table[o], s)
+               for s, table in enumerate(bitboard.SYMMETRY_TABLES))
+
+
+def save(book, path=PATH):
+    """
+    Saves a book as the sorted keys followed by one byte per key
+    holding 4 * cell + value + 1.
+    """
+    keys = sorted(book)
+    entries = bytes(4 * book[key][0] + book[key][1] + 1 for key in keys)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", VERSION, len(keys)))
+        f.write(array("I", keys).tobytes())
+        f.write(entries)
+
+
+def load(path=PATH):
+    """
+    Loads the book saved at path.
+    Returns None if there is no book or it has a different version.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            version, count = struct.unpack("<II", f.read(8))
+            if version != VERSION:
+                return None
+            keys = array("I")
+            keys.frombytes(f.read(4 * count))
+            entries = f.read(count)
+    except (OSError, struct.error, ValueError):
+        return None
+    if len(entries) != count:
+        return None
+    return {key: (entry >> 2, (entry & 3) - 1) for key, entry in zip(keys, entries)}
+
+
+def lookup(book, state):
+    """
+    Returns (action, value) for a non terminal state: an optimal action
+    and the minimax value of the position.
+    """
+    key, symmetry = canonical_symmetry(*state)
+    cell, value = book[key]
+    # The book's cell is on the canonical board, map it back to this one
+    return divmod(bitboard.SYMMETRIES[symmetry].index(cell), 3), value
+
+
+def check(book):
+    """
+    Checks the book against a full minimax search of every reachable position,
+    without symmetries. Returns the list of positions that don't match.
+    """
+    values = {}
+
+    def full_search(state):
+        if state not in values:
+            if bitboard.terminal(state):
+                values[state] = bitboard.utility(state)
+            else:
+                children = [full_search(bitboard.result(state, action))
+                            for action in bitboard.actions(state)]
+                x_to_move = bitboard.player(state) == bitboard.X
+                values[state] = max(children) if x_to_move else min(children)
+        return values[state]
+
+    full_search(bitboard.initial_state())
+
+    mismatches = []
+    for state, value in values.items():
+        if bitboard.terminal(state):
+            continue
+        action, book_value = lookup(book, state)
+        # The action must be legal and keep the value of the position
+        if (action not in bitboard.actions(state) or book_value != value
+                or values[bitboard.result(state, action)] != value):
+            mismatches.append(state)
+    return mismatches
+
+
+def main():
+    if len(sys.argv) not in [2, 3] or sys.argv[1] not in ["build", "check"]:
+        sys.exit("Usage: python book.py build|check [path]")
+    path = sys.argv[2] if len(sys.argv) == 3 else PATH
+
+    if sys.argv[1] == "build":
+        book = build()
+        save(book, path)
+        print(f"Solved {len(book)} positions into {path}.")
+    else:
+        book = load(path)
+        if book is None:
+            sys.exit(f"No book at {path}.")
+        mismatches = check(book)
+        if mismatches:
+            for state in mismatches:
+                print(f"Mismatch: {bitboard.to_board(state)}")
+            sys.exit(f"{len(mismatches)} positions don't match full search.")
+        print("All reachable positions match full search.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+m,n,k-game Player: k in a row on a board of any size
+"""
+
+import math
+import random
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Seconds an AI move may take unless told otherwise
+BUDGET = 1.0
+
+# Boards with more cells than this only consider moves near the stones
+NEARBY_THRESHOLD = 25
+
+# How far from a stone a move may be on those boards
+NEARBY_DISTANCE = 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    An m,n,k-game: two players take turns on a board with rows x columns cells
+    and the first one with k in a row (horizontally, vertically or diagonally) wins.
+    Offers the same functions and constants as tictactoe.py, so Game(3, 3, 3)
+    is Tic Tac Toe.
+    """
+
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, rows=3, columns=3, k=3, budget=BUDGET):
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.budget = budget
+        self.size = rows * columns
+
+        # Every k-in-a-row window as a tuple of cell indices (row-major),
+        # and the windows each cell belongs to
+        self.windows = []
+        for i in range(rows):
+            for j in range(columns):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < columns:
+                        self.windows.append(tuple(
+                            (i + di * s) * columns + j + dj * s for s in range(k)
+                        ))
+        self.cell_windows = [[] for _ in range(self.size)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+
+        # Cells within NEARBY_DISTANCE of each cell
+        self.nearby = []
+        for cell in range(self.size):
+            i, j = divmod(cell, columns)
+            self.nearby.append([
+                a * columns + b
+                for a in range(max(0, i - NEARBY_DISTANCE), min(rows, i + NEARBY_DISTANCE + 1))
+                for b in range(max(0, j - NEARBY_DISTANCE), min(columns, j + NEARBY_DISTANCE + 1))
+                if (a, b) != (i, j)
+            ])
+
+        # Value of a window holding c stones of a single player, the last one a win,
+        # which is worth far more than any sum of the others
+        self.win = 10 ** 9
+        self.weights = [0] + [4 ** c for c in range(1, k)] + [self.win]
+
+        # Zobrist keys to hash positions, and the transposition table shared
+        # by every move of every game: hash -> (depth, value, flag, best move)
+        rng = random.Random(self.size * 100 + k)
+        self.zobrist = [{X: rng.getrandbits(64), O: rng.getrandbits(64)}
+                        for _ in range(self.size)]
+        self.transpositions = {}
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.columns for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        num_x = sum(row.count(X) for row in board)
+        num_o = sum(row.count(O) for row in board)
+        return X if num_x == num_o else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i, row in enumerate(board)
+                for j, cell in enumerate(row) if cell == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise ValueError
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            first = cells[window[0]]
+            if first != EMPTY and all(cells[cell] == first for cell in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(
+            cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        w = self.winner(board)
+        return 1 if w == X else -1 if w == O else 0
+
+    def minimax(self, board, budget=None, cancel=None, stats=None):
+        """
+        Returns the best action found for the current player on the board
+        within budget seconds (the game's budget by default), see Search.
+        The search also stops early once cancel, a threading.Event, is set.
+        If stats is a dictionary, the nodes searched, transposition table hits
+        (cache_hits) and depth of the deepest completed search are stored in it.
+        """
+        if self.terminal(board):
+            return None
+        search = Search(self, board, cancel)
+        action = search.run(self.budget if budget is None else budget)
+        if stats is not None:
+            stats.update(nodes=search.nodes, cache_hits=search.cache_hits,
+                         depth=search.depth)
+        return action
+
+
+class Search():
+    """
+    Iterative deepening alpha-beta (negamax) search of one position.
+    The board is a flat list changed in place, and the stones of each player in
+    every window are counted incrementally, which makes the heuristic evaluation,
+    win detection and move ordering cheap.
+    """
+
+    def __init__(self, game, board, cancel=None):
+        self.game = game
+        self.cancel = cancel
+        self.cells = [cell for row in board for cell in row]
+        self.filled = sum(cell != EMPTY for cell in self.cells)
+        self.counts = {X: [0] * len(game.windows), O: [0] * len(game.windows)}
+        self.hash = 0
+        # Heuristic value of the position for X: open windows of X count for X,
+        # open windows of O count against it
+        self.score = 0
+        for cell, stone in enumerate(self.cells):
+            if stone != EMPTY:
+                self.place(cell, stone)
+                self.filled -= 1
+        self.nodes = 0
+        self.cache_hits = 0
+        self.depth = 0
+        self.deadline = None
+
+    def window_value(self, w):
+        x = self.counts[X][w]
+        o = self.counts[O][w]
+        if o == 0:
+            return self.game.weights[x]
+        if x == 0:
+            return -self.game.weights[o]
+        return 0
+
+    def place(self, cell, stone):
+        """
+        Puts a stone on a cell. Returns True if it completes k in a row.
+        """
+        won = False
+        counts = self.counts[stone]
+        for w in self.game.cell_windows[cell]:
+            self.score -= self.window_value(w)
+            counts[w] += 1
+            self.score += self.window_value(w)
+            if counts[w] == self.game.k:
+                won = True
+        self.cells[cell] = stone
+        self.filled += 1
+        self.hash ^= self.game.zobrist[cell][stone]
+        return won
+
+    def remove(self, cell, stone):
+        """
+        Takes a stone placed with place back.
+        """
+        counts = self.counts[stone]
+        for w in self.game.cell_windows[cell]:
+            self.score -= self.window_value(w)
+            counts[w] -= 1
+            self.score += self.window_value(w)
+        self.cells[cell] = EMPTY
+        self.filled -= 1
+        self.hash ^= self.game.zobrist[cell][stone]
+
+    def run(self, budget):
+        """
+        Searches one ply deeper at a time until the budget runs out, the search
+        is cancelled, the game is solved or the whole tree has been searched.
+        Returns the best action of the deepest completed search.
+        """
+        self.deadline = time.perf_counter() + budget
+        stone = X if self.filled % 2 == 0 else O
+        moves = self.ordered_moves(stone, None)
+        best = moves[0]
+
+        for depth in range(1, self.game.size - self.filled + 1):
+            try:
+                value, move = self.root(stone, depth)
+            except SearchTimeout:
+                break
+            best = move
+            self.depth = depth
+            # Someone has a forced win, searching deeper won't change the move
+            if abs(value) > self.game.win // 2:
+                break
+
+        return divmod(best, self.game.columns)
+
+    def root(self, stone, depth):
+        """
+        Returns (value, move) of the best move found searching depth plies.
+        """
+        other = O if stone == X else X
+        alpha = -math.inf
+        best = None
+        entry = self.game.transpositions.get(self.hash)
+        for move in self.ordered_moves(stone, entry[3] if entry else None):
+            if self.place(move, stone):
+                value = self.game.win - 1
+            else:
+                value = -self.negamax(other, depth - 1, -math.inf, -alpha, 1)
+            self.remove(move, stone)
+            if best is None or value > alpha:
+                alpha = value
+                best = move
+        self.game.transpositions[self.hash] = (depth, alpha, EXACT, best)
+        return alpha, best
+
+    def negamax(self, stone, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player with the given stone
+        to move, searching depth more plies, if it is between alpha and beta.
+        Otherwise a bound on the side of the window it is on.
+        """
+        self.nodes += 1
+        if self.nodes % 256 == 0 and (time.perf_counter() > self.deadline or (
+                self.cancel is not None and self.cancel.is_set())):
+            raise SearchTimeout
+
+        if self.filled == self.game.size:
+            return 0
+        if depth == 0:
+            return self.score if stone == X else -self.score
+
+        # A stored value answers the search if it was searched at least as deep
+        # and is exact or its bound is outside the window
+        entry = self.game.transpositions.get(self.hash)
+        if entry is not None and entry[0] >= depth:
+            value = from_table(entry[1], ply, self.game.win)
+            flag = entry[2]
+            if (flag == EXACT or (flag == LOWER and value >= beta)
+                    or (flag == UPPER and value <= alpha)):
+                self.cache_hits += 1
+                return value
+
+        original_alpha = alpha
+        other = O if stone == X else X
+        best_value = -math.inf
+        best_move = None
+        for move in self.ordered_moves(stone, entry[3] if entry else None):
+            if self.place(move, stone):
+                # Winning sooner is better
+                value = self.game.win - ply - 1
+            else:
+                value = -self.negamax(other, depth - 1, -beta, -alpha, ply + 1)
+            self.remove(move, stone)
+
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.game.transpositions[self.hash] = (
+            depth, to_table(best_value, ply, self.game.win), flag, best_move)
+        return best_value
+
+    def ordered_moves(self, stone, first):
+        """
+        Returns the candidate moves, most promising first: the best move of
+        an earlier search, then moves that extend or block the most windows.
+        Large boards only consider moves near the stones already placed.
+        """
+        cells = self.cells
+        if self.game.size <= NEARBY_THRESHOLD:
+            moves = [cell for cell in range(self.game.size) if cells[cell] == EMPTY]
+        elif self.filled == 0:
+            moves = [self.game.size // 2]
+        else:
+            moves = list({near for cell in range(self.game.size) if cells[cell] != EMPTY
+                          for near in self.game.nearby[cell] if cells[near] == EMPTY})
+
+        own = self.counts[stone]
+        opponent = self.counts[O if stone == X else X]
+        weights = self.game.weights
+
+        def priority(cell):
+            if cell == first:
+                return math.inf
+            value = 0
+            for w in self.game.cell_windows[cell]:
+                if opponent[w] == 0:
+                    value += weights[own[w] + 1]
+                if own[w] == 0:
+                    value += weights[opponent[w] + 1]
+            return value
+
+        moves.sort(key=priority, reverse=True)
+        return moves
+
+
+# Flags of the values in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def to_table(value, ply, win):
+    """
+    Win values depend on how far the win is from the root, the table stores
+    them relative to the position instead so they can be reused at any ply.
+    """
+    if value > win // 2:
+        return value + ply
+    if value < -win // 2:
+        return value - ply
+    return value
+
+
+def from_table(value, ply, win):
+    """
+    Turns a value stored with to_table back into a value at ply.
+    """
+    if value > win // 2:
+        return value - ply
+    if value < -win // 2:
+        return value + ply
+    return value
@@ -1,12 +1,27 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
+# python runner.py [rows columns k] plays k in a row on a bigger board
+if len(sys.argv) == 4:
+    rows, columns, k = map(int, sys.argv[1:])
+    ttt = mnk.Game(rows, columns, k)
+elif len(sys.argv) == 1:
+    rows, columns, k = 3, 3, 3
+else:
+    sys.exit("Usage: python runner.py [rows columns k]")
+
 pygame.init()
 size = width, height = 600, 400
 
+# Fit the board between the title and the play again button
+tile_size = int(min(80, (height - 140) / rows, (width - 40) / columns))
+
 # Colors
 black = (0, 0, 0)
 white = (255, 255, 255)
@@ -15,16 +30,50 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 16)
+
+# Seconds the computer seems to think at least, even when it finds its move at once
+THINKING_TIME = 0.5
+
+
+def think(board, cancel):
+    """
+    Runs in the AI thread: returns the computer's move on the board
+    and statistics about the search.
+    """
+    stats = {}
+    start = time.perf_counter()
+    if isinstance(ttt, mnk.Game):
+        move = ttt.minimax(board, cancel=cancel, stats=stats)
+    else:
+        move = ttt.minimax(board, stats=stats)
+    stats["time"] = time.perf_counter() - start
+    return move, stats
+
+
+def stop_thinking():
+    """
+    Cancels the computer's search, if it is thinking.
+    """
+    if search is not None:
+        search[1].set()
+
+
+# The AI searches in a background thread so the window keeps responding.
+# search is (future, cancel event, start time) while the computer is thinking.
+ai = ThreadPoolExecutor(max_workers=1)
+search = None
+stats = None
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            stop_thinking()
             sys.exit()
 
     screen.fill(black)
@@ -33,7 +82,10 @@ while True:
     if user is None:
 
         # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
+        if (rows, columns, k) == (3, 3, 3):
+            title = largeFont.render("Play Tic-Tac-Toe", True, white)
+        else:
+            title = largeFont.render(f"Play {k} in a row", True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
@@ -67,19 +119,18 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (columns / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(columns):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
                     tile_size, tile_size
                 )
-                pygame.draw.rect(screen, white, rect, 3)
+                pygame.draw.rect(screen, white, rect, 3 if tile_size > 30 else 1)
 
                 if board[i][j] != ttt.EMPTY:
                     move = moveFont.render(board[i][j], True, white)
@@ -108,39 +159,52 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
+        # Show how the computer found its last move
+        if stats is not None:
+            line = (f"{stats['nodes']:,} nodes, {stats['cache_hits']:,} cache hits, "
+                    f"{1000 * stats['time']:.1f} ms")
+            if "depth" in stats:
+                line += f", depth {stats['depth']}"
+            line = smallFont.render(line, True, white)
+            lineRect = line.get_rect()
+            lineRect.center = ((width / 2), 62)
+            screen.blit(line, lineRect)
+
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if search is None:
+                cancel = threading.Event()
+                search = (ai.submit(think, board, cancel), cancel, time.perf_counter())
+            elif search[0].done() and time.perf_counter() - search[2] >= THINKING_TIME:
+                move, stats = search[0].result()
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(columns):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # The game can be reset at any time, even while the computer is thinking
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                stop_thinking()
+                search = None
+                stats = None
+                user = None
+                board = ttt.initial_state()
 
     pygame.display.flip()
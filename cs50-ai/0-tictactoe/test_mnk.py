@@ -0,0 +1,26 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mnk
+
+
+def test_game_has_tictactoe_constants():
+    game = mnk.Game(4, 4, 3)
+    assert (game.X, game.O, game.EMPTY) == (mnk.X, mnk.O, mnk.EMPTY)
+    assert game.player(game.initial_state()) == game.X
+
+
+def test_cancelled_search_returns_a_move_early():
+    game = mnk.Game(15, 15, 5)
+    board = game.result(game.initial_state(), (7, 7))
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as ai:
+        start = time.perf_counter()
+        future = ai.submit(game.minimax, board, budget=60, cancel=cancel)
+        time.sleep(0.2)
+        assert not future.done()
+        cancel.set()
+        move = future.result(timeout=1)
+        assert time.perf_counter() - start < 1.5
+    assert move in game.actions(board)
@@ -0,0 +1,118 @@
+"""
+Smoke tests of runner.py: the game loop runs without a window (SDL's dummy
+video driver) while scripted mouse clicks play the user's moves.
+"""
+
+import os
+import runpy
+import sys
+import time
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Where runner.py draws its buttons on its 600x400 window
+PLAY_AS_X = (150, 225)
+RESET = (300, 360)
+
+
+class Stop(Exception):
+    """Raised from the loop once a test has seen what it wanted."""
+
+
+def run_runner(monkeypatch, argv, frame):
+    """
+    Runs runner.py with argv, calling frame(state) at the end of every frame
+    with the runner's globals. frame returns the position to click during
+    the next frame (or None) and raises Stop to end the loop.
+    Returns the runner's globals.
+    """
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    monkeypatch.chdir(HERE)
+    monkeypatch.syspath_prepend(HERE)
+    monkeypatch.setattr(sys, "argv", ["runner.py"] + [str(n) for n in argv])
+
+    click = [None]
+    state = {}
+    monkeypatch.setattr(pygame.mouse, "get_pressed",
+                        lambda *args: (1 if click[0] else 0, 0, 0))
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: click[0] or (0, 0))
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    def flip():
+        state.update(sys._getframe(1).f_globals)
+        click[0] = frame(state)
+
+    monkeypatch.setattr(pygame.display, "flip", flip)
+    try:
+        runpy.run_path(os.path.join(HERE, "runner.py"), run_name="__main__")
+    except Stop:
+        pass
+    finally:
+        if state.get("search") is not None:
+            state["stop_thinking"]()
+        pygame.quit()
+    return state
+
+
+def tile_center(state, cell):
+    """
+    Returns the position of the middle of a cell's tile,
+    or None before the board is first drawn.
+    """
+    if "tiles" not in state:
+        return None
+    return state["tiles"][cell[0]][cell[1]].center
+
+
+def test_plays_a_game_on_a_bigger_board(monkeypatch):
+    deadline = time.perf_counter() + 60
+
+    def frame(state):
+        if time.perf_counter() > deadline:
+            raise AssertionError("the game didn't end")
+        game, board = state["ttt"], state["board"]
+        if state["user"] is None:
+            return PLAY_AS_X
+        if game.terminal(board):
+            raise Stop
+        if game.player(board) == state["user"]:
+            return tile_center(state, min(game.actions(board)))
+        return None
+
+    state = run_runner(monkeypatch, [4, 4, 3], frame)
+    game, board = state["ttt"], state["board"]
+    assert game.terminal(board)
+    assert sum(cell is not None for row in board for cell in row) >= 5
+    assert state["stats"]["nodes"] > 0
+
+
+def test_reset_cancels_the_computer_search(monkeypatch):
+    thinking = {}
+
+    def frame(state):
+        game, board = state["ttt"], state["board"]
+        if thinking:
+            raise Stop
+        if state["user"] is None:
+            return PLAY_AS_X
+        if state["search"] is not None:
+            # The computer started thinking about its first move
+            thinking["future"] = state["search"][0]
+            return RESET
+        if game.player(board) == state["user"]:
+            return tile_center(state, (3, 3))
+        return None
+
+    start = time.perf_counter()
+    state = run_runner(monkeypatch, [7, 7, 4], frame)
+    move, stats = thinking["future"].result(timeout=0.5)
+    assert time.perf_counter() - start < state["ttt"].budget
+    assert move is not None
+    assert state["user"] is None
+    assert state["search"] is None
+    assert state["board"] == state["ttt"].initial_state()
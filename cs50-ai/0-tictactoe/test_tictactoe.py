@@ -0,0 +1,35 @@
+import tictactoe as ttt
+from tictactoe import EMPTY, O, X
+
+
+def test_minimax_searches_boards_missing_from_the_book():
+    # O moved twice, which can't happen in a game, so the book doesn't have it
+    board = [[O, O, EMPTY],
+             [EMPTY, EMPTY, EMPTY],
+             [EMPTY, EMPTY, EMPTY]]
+    assert ttt.opening_book is not None
+    stats = {}
+    action = ttt.minimax(board, stats=stats)
+    assert stats["nodes"] > 0
+
+    # As good a move for X as the plain minimax search finds
+    best = ttt.min_value(ttt.result(board, ttt.minimax(board, memoized=False)))
+    assert ttt.min_value(ttt.result(board, action)) == best
+
+
+def test_minimax_looks_up_boards_in_the_book():
+    board = [[X, EMPTY, EMPTY],
+             [EMPTY, O, EMPTY],
+             [EMPTY, EMPTY, X]]
+    stats = {}
+    action = ttt.minimax(board, stats=stats)
+    assert stats == {"nodes": 0, "cache_hits": 1}
+    assert ttt.minimax(board, memoized=False) in ttt.actions(board)
+    assert ttt.utility(play_out(ttt.result(board, action))) == 0
+
+
+def play_out(board):
+    """Plays both sides with minimax until the game ends."""
+    while not ttt.terminal(board):
+        board = ttt.result(board, ttt.minimax(board))
+    return board
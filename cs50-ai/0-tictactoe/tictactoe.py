@@ -5,11 +5,17 @@ Tic Tac Toe Player
 import math
 from copy import deepcopy
 
+import bitboard
+import book
+
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Solved positions, see book.py, or None if the book hasn't been built
+opening_book = book.load()
+
 
 def initial_state():
     """
@@ -138,15 +144,36 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def minimax(board, memoized=True, stats=None):
     """
     Returns the optimal action for the current player on the board.
+    By default the answer is looked up in the opening book, or searched by the
+    bitboard alpha-beta engine with its shared transposition table if there is no
+    book or the board isn't in it. memoized=False runs the plain minimax search
+    over the whole game tree.
+    If stats is a dictionary, the nodes searched and cache hits of a memoized
+    search are stored in it, a book lookup counts as a single cache hit.
     """
     
     # If the board is a terminal board, the minimax function should return None
     if terminal(board) == True:
         return None
 
+    if memoized:
+        state = bitboard.from_board(board)
+        if opening_book is not None:
+            try:
+                action = book.lookup(opening_book, state)[0]
+            except KeyError:
+                # Boards that can't come up in a game (like O moving first)
+                # aren't in the book, search them instead
+                pass
+            else:
+                if stats is not None:
+                    stats.update(nodes=0, cache_hits=1)
+                return action
+        return bitboard.minimax(state, stats)
+
     # Create empty lists to store the value of each action
     vals = []
     acts = []
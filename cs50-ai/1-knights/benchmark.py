@@ -0,0 +1,84 @@
+import itertools
+import time
+
+from logic import (KnowledgeBase, compile_sentence, compiled_check, model_check,
+                   sat_check, table_check)
+import puzzle
+
+PUZZLES = [
+    ("Puzzle 0", puzzle.knowledge0),
+    ("Puzzle 1", puzzle.knowledge1),
+    ("Puzzle 2", puzzle.knowledge2),
+    ("Puzzle 3", puzzle.knowledge3),
+]
+
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+           puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+
+# Each model is evaluated this many times, so timings aren't too short to measure
+REPEAT = 2000
+
+
+def main():
+    compare_evaluation()
+    compare_entailment()
+
+
+def compare_evaluation():
+    """
+    Times evaluating each knowledge base in every model of the puzzle's
+    symbols, walking the sentence with a dict model and with the compiled
+    function of a tuple model.
+    """
+    names = sorted(symbol.name for symbol in SYMBOLS)
+    models = list(itertools.product((True, False), repeat=len(names))) * REPEAT
+    for name, knowledge in PUZZLES:
+        dict_models = [dict(zip(names, model)) for model in models]
+        start = time.perf_counter()
+        expected = [knowledge.evaluate(model) for model in dict_models]
+        tree = time.perf_counter() - start
+
+        start = time.perf_counter()
+        function = compile_sentence(knowledge, names)
+        compiling = time.perf_counter() - start
+        start = time.perf_counter()
+        results = list(map(function, models))
+        compiled = time.perf_counter() - start
+
+        assert results == expected
+        print(f"{name}: evaluate {len(models) / tree:,.0f} models/s, "
+              f"compiled {len(models) / compiled:,.0f} models/s "
+              f"({tree / compiled:.1f}x, compiling took {1000 * compiling:.2f}ms)")
+
+
+def compare_entailment():
+    """
+    Times asking every knowledge base about every symbol with each
+    entailment check, and checks they all give the same answers.
+    """
+    checks = {
+        "model_check": model_check,
+        "compiled_check": compiled_check,
+        "table_check": table_check,
+        "sat_check": sat_check,
+    }
+    answers = {}
+    for check_name, check in checks.items():
+        start = time.perf_counter()
+        answers[check_name] = [check(knowledge, symbol)
+                               for _, knowledge in PUZZLES for symbol in SYMBOLS]
+        elapsed = time.perf_counter() - start
+        print(f"{check_name}: {len(answers[check_name])} queries in {1000 * elapsed:.2f}ms")
+
+    # One knowledge base per puzzle, asked about every symbol
+    start = time.perf_counter()
+    knowledge_bases = [KnowledgeBase(knowledge) for _, knowledge in PUZZLES]
+    answers["KnowledgeBase"] = [knowledge_base.ask(symbol)
+                                for knowledge_base in knowledge_bases for symbol in SYMBOLS]
+    elapsed = time.perf_counter() - start
+    print(f"KnowledgeBase: {len(answers['KnowledgeBase'])} queries in {1000 * elapsed:.2f}ms")
+    assert all(result == answers["model_check"] for result in answers.values())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,58 @@
+import functools
 import itertools
+import multiprocessing
+import operator
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    # Truth tables are then evaluated as the bits of Python integers
+    np = None
+
+import sat
+
+# table_check evaluates 2 ** CHUNK_BITS models at a time
+CHUNK_BITS = 20
 
 
 class Sentence():
+    """
+    Sentences are immutable and hash-consed: building a sentence equal to one
+    that already exists returns that same object. Equal sentences are then
+    the same object, and each sentence's hash and symbols are computed once,
+    when it is built, from those of its parts.
+    """
+
+    __slots__ = ("_parts", "_hash", "_symbols", "__weakref__")
+
+    # Every sentence in use, by its class and parts
+    interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, *parts):
+        key = (cls, parts)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence._parts = parts
+            sentence._hash = hash(key)
+            sentence._symbols = frozenset()
+            sentence.build(*parts)
+            sentence = Sentence.interned.setdefault(key, sentence)
+        return sentence
+
+    def build(self, *parts):
+        """Sets up a new sentence from its parts."""
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Copied and unpickled sentences are interned like new ones
+        return (type(self), self._parts)
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -12,8 +63,23 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
-        return set()
+        """Returns a frozen set of all symbols in the logical sentence."""
+        return self._symbols
+
+    def expression(self, index):
+        """
+        Returns a Python expression evaluating the logical sentence in a
+        model m, a sequence of truth values with index[name] for each symbol.
+        """
+        raise Exception("nothing to evaluate")
+
+    def evaluate_columns(self, columns, true):
+        """
+        Evaluates the logical sentence in many models at once. columns[name]
+        holds the truth value of a symbol in each model, as a NumPy boolean
+        array or the bits of an integer, and true holds True in every model.
+        """
+        raise Exception("nothing to evaluate")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +109,11 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
+    def build(self, name):
         self.name = name
-
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
-
-    def __hash__(self):
-        return hash(("symbol", self.name))
+        self._symbols = frozenset([name])
 
     def __repr__(self):
         return self.name
@@ -65,20 +127,26 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def expression(self, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def evaluate_columns(self, columns, true):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def build(self, operand):
         Sentence.validate(operand)
         self.operand = operand
-
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
-
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        self._symbols = operand._symbols
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +157,22 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def evaluate_columns(self, columns, true):
+        return true ^ self.operand.evaluate_columns(columns, true)
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def build(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        self.conjuncts = conjuncts
+        self._symbols = frozenset().union(
+            *[conjunct._symbols for conjunct in conjuncts])
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,9 +180,12 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
-    def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+    def with_conjuncts(self, *conjuncts):
+        """
+        Returns the conjunction of these conjuncts and conjuncts, the
+        immutable equivalent of adding conjuncts to it.
+        """
+        return And(*self.conjuncts, *conjuncts)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +196,26 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts) + ")"
+
+    def evaluate_columns(self, columns, true):
+        return functools.reduce(operator.and_, (
+            conjunct.evaluate_columns(columns, true) for conjunct in self.conjuncts), true)
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def build(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        self.disjuncts = disjuncts
+        self._symbols = frozenset().union(
+            *[disjunct._symbols for disjunct in disjuncts])
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +230,26 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts) + ")"
+
+    def evaluate_columns(self, columns, true):
+        return functools.reduce(operator.or_, (
+            disjunct.evaluate_columns(columns, true) for disjunct in self.disjuncts), true ^ true)
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def build(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        self._symbols = antecedent._symbols | consequent._symbols
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,41 +263,45 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def evaluate_columns(self, columns, true):
+        antecedent = self.antecedent.evaluate_columns(columns, true)
+        consequent = self.consequent.evaluate_columns(columns, true)
+        return (true ^ antecedent) | consequent
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def build(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        self._symbols = left._symbols | right._symbols
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def expression(self, index):
+        return f"({self.left.expression(index)} == {self.right.expression(index)})"
+
+    def evaluate_columns(self, columns, true):
+        left = self.left.evaluate_columns(columns, true)
+        right = self.right.evaluate_columns(columns, true)
+        return true ^ left ^ right
 
 
 def model_check(knowledge, query):
@@ -257,7 +336,227 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles a sentence into a function of a model given as a sequence of
+    truth values, one for each symbol name in symbols in that order.
+    The function is a single Python expression (see Sentence.expression), so
+    evaluating it runs flat bytecode instead of walking the sentence,
+    unless the sentence is nested too deeply for Python to parse.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    try:
+        return eval(f"lambda m: {sentence.expression(index)}")
+    except (SyntaxError, RecursionError, MemoryError):
+        # Nested too deeply for the parser, evaluate the tree instead
+        return lambda m: sentence.evaluate(dict(zip(symbols, m)))
+
+
+def compiled_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like model_check, by evaluating
+    knowledge => query compiled (see compile_sentence) in every model.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    entailed = compile_sentence(Implication(knowledge, query), symbols)
+    return all(map(entailed, itertools.product((True, False), repeat=len(symbols))))
+
+
+def table_check(knowledge, query, workers=1):
+    """
+    Checks if knowledge base entails query, like model_check, by evaluating
+    knowledge ∧ ¬query in every model at once, as whole columns of a truth
+    table (see Sentence.evaluate_columns), 2 ** CHUNK_BITS models at a time.
+    With more than one worker, the chunks are split across processes.
+    """
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    chunks = 2 ** max(0, len(symbols) - CHUNK_BITS)
+    tasks = [(knowledge, query, symbols, chunk) for chunk in range(chunks)]
+    if workers <= 1 or chunks == 1:
+        return all(map(check_chunk, tasks))
+    with multiprocessing.Pool(workers) as pool:
+        return all(pool.imap_unordered(check_chunk, tasks))
+
+
+def check_chunk(task):
+    """
+    Checks that query is true in every model of a chunk where knowledge is.
+    The first CHUNK_BITS symbols take every combination of values within the
+    chunk, the rest are fixed by the bits of the chunk's number.
+    """
+    knowledge, query, symbols, chunk = task
+    varying = min(len(symbols), CHUNK_BITS)
+    size = 2 ** varying
+    columns = {}
+    if np is not None:
+        models = np.arange(size)
+        true = np.ones(size, dtype=bool)
+        for i, name in enumerate(symbols[:varying]):
+            columns[name] = (models >> i) & 1 == 1
+    else:
+        # Bit k of a column is the value in model k, symbol i being true in
+        # runs of 2 ** i models every 2 ** (i + 1), repeated by doubling
+        true = (1 << size) - 1
+        for i, name in enumerate(symbols[:varying]):
+            column = ((1 << 2 ** i) - 1) << 2 ** i
+            width = 2 ** (i + 1)
+            while width < size:
+                column |= column << width
+                width *= 2
+            columns[name] = column
+    for i, name in enumerate(symbols[varying:]):
+        columns[name] = true if chunk >> i & 1 else true ^ true
+
+    counterexamples = (knowledge.evaluate_columns(columns, true)
+                       & (true ^ query.evaluate_columns(columns, true)))
+    return not counterexamples.any() if np is not None else not counterexamples
+
+
+class Encoder():
+    """
+    Tseitin encoding of sentences into the clauses of a sat.Solver.
+    Every compound sentence gets a variable that is true exactly when the
+    sentence is, so the clauses grow linearly with the size of the sentences
+    instead of exponentially like distributing Or over And.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else sat.Solver()
+
+        # Variable of each symbol name, and literal of each compound sentence
+        # so that repeated parts of sentences are only encoded once
+        self.variables = {}
+        self.literals = {}
+
+    def variable(self, name):
+        """Returns the variable of a symbol, adding it if it is new."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when sentence is."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        add_clause = self.solver.add_clause
+        if isinstance(sentence, (And, Or)):
+            conjunction = isinstance(sentence, And)
+            parts = sentence.conjuncts if conjunction else sentence.disjuncts
+            parts = [self.literal(part) for part in parts]
+            if len(parts) == 1:
+                return parts[0]
+            x = self.solver.new_variable()
+            # For Or, the same clauses with every literal negated
+            sign = 1 if conjunction else -1
+            for part in parts:
+                add_clause([-sign * x, sign * part])
+            add_clause([sign * x] + [-sign * part for part in parts])
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.solver.new_variable()
+            add_clause([-x, -a, b])
+            add_clause([x, a])
+            add_clause([x, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.solver.new_variable()
+            add_clause([-x, -a, b])
+            add_clause([-x, a, -b])
+            add_clause([x, a, b])
+            add_clause([x, -a, -b])
+        else:
+            raise Exception(f"can't encode {sentence}")
+
+        self.literals[sentence] = x
+        return x
+
+    def add(self, sentence):
+        """
+        Adds the clauses saying that sentence is true. Conjunctions, disjunctions
+        and implications at the top don't need a variable of their own.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.solver.add_clause([-self.literal(sentence.antecedent),
+                                    self.literal(sentence.consequent)])
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like model_check, by having
+    a SAT solver (see sat.py) show that knowledge ∧ ¬query can't be true.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(query)])
+
+
+class KnowledgeBase():
+    """
+    Sentences known to be true, kept as the clauses of a sat.Solver so that
+    asking it many queries reuses what the solver learnt answering earlier
+    ones (see sat_check). Answers are remembered until the next tell.
+    """
+
+    def __init__(self, *sentences):
+        self.encoder = Encoder()
+        self.sentences = []
+
+        # Answer to each query asked, and models of the knowledge base found
+        # along the way, both only valid until the next tell
+        self.answers = {}
+        self.models = []
+
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.encoder.add(sentence)
+        self.answers.clear()
+        self.models.clear()
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        Sentence.validate(query)
+        if query not in self.answers:
+            self.answers[query] = self.entails(query)
+        return self.answers[query]
+
+    def entails(self, query):
+        """
+        Checks if the knowledge base entails query, first looking for a model
+        found by an earlier query in which query is false.
+        """
+        symbols = query.symbols()
+        for model in self.models:
+            if symbols <= model.keys() and not query.evaluate(model):
+                return False
+
+        solver = self.encoder.solver
+        if not solver.solve([-self.encoder.literal(query)]):
+            return True
+        self.models.append({name: solver.model[variable] == 1
+                            for name, variable in self.encoder.variables.items()})
+        return False
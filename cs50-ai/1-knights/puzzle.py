@@ -113,8 +113,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            knowledge_base = KnowledgeBase(knowledge)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if knowledge_base.ask(symbol):
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,328 @@
+"""
+Conflict-driven clause learning (CDCL) SAT solver
+"""
+
+import heapq
+
+# Conflicts before the first restart, later restarts follow the Luby sequence
+RESTART_BASE = 100
+
+# Every conflict, the activity of variables not involved fades by this factor
+ACTIVITY_DECAY = 0.95
+
+
+class Solver():
+    """
+    Decides whether a set of clauses can be satisfied.
+    Variables are numbered from 1 and a literal is a variable (true) or its
+    negation (false), a clause is a list of literals of which one must be true.
+
+    Clauses can be added between calls to solve, which keeps what it learnt,
+    and solve can be given assumptions that only hold for that call.
+    """
+
+    def __init__(self):
+        # Clauses, each watched by its first two literals: watches[literal]
+        # lists the clauses watching literal, visited when it becomes false
+        self.clauses = []
+        self.watches = {}
+
+        # Per variable (index 0 unused): 1 if true, -1 if false, 0 if unassigned,
+        # the decision level and clause (index) that assigned it, and its activity
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+
+        # Assigned literals in order, where each decision level starts,
+        # and the first literal whose consequences haven't been propagated
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+
+        # Unassigned variables by activity, with stale entries skipped when popped
+        self.order = []
+        self.increment = 1.0
+
+        # False once the clauses are known to be unsatisfiable
+        self.ok = True
+
+        # Values of the variables in the last solution found
+        self.model = None
+
+        self.conflicts = 0
+
+    def new_variable(self):
+        """
+        Adds a variable and returns it.
+        """
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        variable = len(self.values) - 1
+        self.watches[variable] = []
+        self.watches[-variable] = []
+        heapq.heappush(self.order, (0.0, variable))
+        return variable
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if it is false, 0 if it is unassigned.
+        """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses are now unsatisfiable.
+        """
+        if not self.ok:
+            return False
+
+        # Drop repeated literals and literals known to be false,
+        # and clauses that are always true or already satisfied
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause):
+        """
+        Stores a clause of at least two literals, watching its first two.
+        Returns its index.
+        """
+        self.clauses.append(clause)
+        index = len(self.clauses) - 1
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        """
+        Makes literal true at the current decision level.
+        """
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Unit propagation: assigns the last literal of every clause whose
+        other literals are all false, until nothing changes.
+        Only clauses watching a literal that became false are looked at.
+        Returns the index of a clause with all its literals false, or None.
+        """
+        values = self.values
+        clauses = self.clauses
+        watches = self.watches
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = watches[false_literal]
+            kept = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                # Keep the false literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that isn't false, if there is one
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)] if literal > 0 else -values[abs(literal)]
+                    if value != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if first_value == -1:
+                        kept.extend(watching[position + 1:])
+                        watches[false_literal] = kept
+                        return index
+                    self.assign(first, index)
+            watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Follows the reasons of the literals in a conflicting clause back to the
+        first unique implication point of the current decision level.
+        Returns (learnt, level): a clause implied by the others whose first
+        literal becomes unit after backjumping to level.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        clause = self.clauses[conflict]
+        position = len(self.trail) - 1
+
+        while True:
+            # The first literal of a reason clause is the one it implied
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+
+            # The latest assigned literal of the current level still to look at
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal of the highest remaining level second, so the
+        # clause is unit right after backjumping
+        highest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, variable):
+        """
+        Makes a variable involved in a conflict more likely to be decided next.
+        """
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v) for v in range(1, len(self.values))
+                          if self.values[v] == 0]
+            heapq.heapify(self.order)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backjump(self, level):
+        """
+        Unassigns everything assigned after decision level.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity, or None.
+        """
+        while self.order:
+            activity, variable = heapq.heappop(self.order)
+            if self.values[variable] == 0 and -activity == self.activity[variable]:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and the assumptions (literals taken to be
+        true for this call only) can all be satisfied, storing the values
+        in model, False otherwise.
+        """
+        if not self.ok:
+            return False
+        assumptions = list(assumptions)
+        restarts = 0
+        budget = RESTART_BASE * luby(restarts)
+        conflicts = 0
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.assign(learnt[0], self.attach(learnt))
+                self.increment /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= budget:
+                restarts += 1
+                budget = RESTART_BASE * luby(restarts)
+                conflicts = 0
+                self.backjump(0)
+                continue
+
+            # Assumptions are decided first, one decision level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:
+                    self.backjump(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                self.model = self.values[:]
+                self.backjump(0)
+                return True
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def luby(i):
+    """
+    Returns the i-th number (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    """
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power -= 1
+        i = i % size
+    return 2 ** power
@@ -0,0 +1,130 @@
+import itertools
+import random
+
+import pytest
+
+import logic
+import sat
+from logic import (And, Biconditional, Implication, KnowledgeBase, Not, Or, Symbol,
+                   compiled_check, model_check, sat_check, table_check)
+
+
+def random_sentence(rng, names, depth):
+    if depth == 0 or rng.random() < 0.2:
+        symbol = Symbol(rng.choice(names))
+        return Not(symbol) if rng.random() < 0.3 else symbol
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, names, depth - 1))
+    if kind == 1:
+        return And(*[random_sentence(rng, names, depth - 1) for _ in range(rng.randint(1, 3))])
+    if kind == 2:
+        return Or(*[random_sentence(rng, names, depth - 1) for _ in range(rng.randint(1, 3))])
+    if kind == 3:
+        return Implication(random_sentence(rng, names, depth - 1),
+                           random_sentence(rng, names, depth - 1))
+    return Biconditional(random_sentence(rng, names, depth - 1),
+                         random_sentence(rng, names, depth - 1))
+
+
+@pytest.mark.parametrize("chunk_bits", [logic.CHUNK_BITS, 2])
+def test_checks_agree_with_model_check(monkeypatch, chunk_bits):
+    # Small chunks make table_check fix some symbols by the chunk's number
+    monkeypatch.setattr(logic, "CHUNK_BITS", chunk_bits)
+    rng = random.Random(0)
+    entailed = 0
+    for _ in range(400):
+        names = [f"s{i}" for i in range(rng.randint(1, 6))]
+        knowledge = random_sentence(rng, names, 4)
+        query = random_sentence(rng, names, 3)
+        expected = model_check(knowledge, query)
+        entailed += expected
+        assert sat_check(knowledge, query) == expected, (knowledge, query)
+        assert table_check(knowledge, query) == expected, (knowledge, query)
+        assert compiled_check(knowledge, query) == expected, (knowledge, query)
+    # Both answers were tried
+    assert 0 < entailed < 400
+
+
+def test_knowledge_base_agrees_with_model_check():
+    rng = random.Random(1)
+    for _ in range(100):
+        names = [f"s{i}" for i in range(rng.randint(1, 6))]
+        sentences = [random_sentence(rng, names, 3) for _ in range(rng.randint(1, 3))]
+        kb = KnowledgeBase(*sentences)
+        knowledge = And(*sentences)
+        # Asking many queries, some twice, reuses answers and models
+        for _ in range(10):
+            query = random_sentence(rng, names, 3)
+            assert kb.ask(query) == model_check(knowledge, query), (knowledge, query)
+
+
+def test_knowledge_base_forgets_answers_when_told_more():
+    a, b, c = Symbol("A"), Symbol("B"), Symbol("C")
+    kb = KnowledgeBase(Or(a, b))
+    assert not kb.ask(a)
+    assert not kb.ask(b)
+    assert kb.models
+
+    # The answers and the models they found no longer hold
+    kb.tell(Not(a))
+    assert kb.ask(b)
+    assert not kb.ask(a)
+
+    # A symbol the knowledge base has never seen
+    assert not kb.ask(c)
+    assert not kb.ask(Not(c))
+    assert kb.ask(Or(c, Not(c)))
+    assert kb.ask(Implication(c, b))
+    kb.tell(c)
+    assert kb.ask(c)
+    assert kb.ask(And(b, c))
+
+
+def satisfies(values, clauses):
+    return all(any((values[abs(literal)] == 1) == (literal > 0) for literal in clause)
+               for clause in clauses)
+
+
+def brute_force(variables, clauses):
+    """Returns whether some assignment of the variables satisfies clauses."""
+    return any(satisfies((None,) + tuple(1 if bit else -1 for bit in bits), clauses)
+               for bits in itertools.product((True, False), repeat=variables))
+
+
+def random_clause(rng, variables):
+    return [rng.choice((1, -1)) * rng.randint(1, variables) for _ in range(rng.randint(1, 3))]
+
+
+def test_solver_agrees_with_brute_force():
+    rng = random.Random(2)
+    satisfiable = 0
+    for _ in range(300):
+        variables = rng.randint(1, 8)
+        solver = sat.Solver()
+        for _ in range(variables):
+            solver.new_variable()
+
+        # Clauses are added a few at a time between calls to solve
+        clauses = []
+        for _ in range(rng.randint(1, 4)):
+            for _ in range(rng.randint(1, 2 * variables)):
+                clause = random_clause(rng, variables)
+                clauses.append(clause)
+                solver.add_clause(clause)
+
+            assumed = rng.sample(range(1, variables + 1), rng.randint(0, min(2, variables)))
+            assumptions = [rng.choice((1, -1)) * variable for variable in assumed]
+            expected = brute_force(variables, clauses + [[a] for a in assumptions])
+            assert solver.solve(assumptions) == expected, (clauses, assumptions)
+            if expected:
+                assert satisfies(solver.model, clauses)
+                assert all(solver.model[abs(a)] == (1 if a > 0 else -1) for a in assumptions)
+
+            # Assumptions only hold for the call they are given to
+            expected = brute_force(variables, clauses)
+            satisfiable += expected
+            assert solver.solve() == expected, clauses
+            if expected:
+                assert satisfies(solver.model, clauses)
+    assert satisfiable > 0
@@ -0,0 +1,103 @@
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Beginner, intermediate and expert boards as HEIGHTxWIDTHxMINES
+BOARDS = ["8x8x10", "16x16x40", "16x30x99"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plays seeded games of Minesweeper with the AI, without a window.")
+    parser.add_argument("boards", nargs="*", type=parse_board,
+                        default=[parse_board(board) for board in BOARDS],
+                        help=f"boards as HEIGHTxWIDTHxMINES (default: {' '.join(BOARDS)})")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games per board")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game, the others follow")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--verbose", action="store_true",
+                        help="keep the AI's prints, which slow it down a lot")
+    args = parser.parse_args()
+
+    for height, width, mines in args.boards:
+        games = [(height, width, mines, seed, args.verbose)
+                 for seed in range(args.seed, args.seed + args.games)]
+        start = time.perf_counter()
+        if args.workers <= 1:
+            results = list(map(play, games))
+        else:
+            with multiprocessing.Pool(args.workers) as pool:
+                results = pool.map(play, games, chunksize=max(1, len(games) // (4 * args.workers)))
+        elapsed = time.perf_counter() - start
+        report(height, width, mines, results, elapsed)
+
+
+def parse_board(text):
+    """
+    Returns (height, width, mines) of a board written as HEIGHTxWIDTHxMINES.
+    """
+    try:
+        height, width, mines = map(int, text.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid board {text!r}, expected HEIGHTxWIDTHxMINES")
+    if not 0 < mines < height * width:
+        raise argparse.ArgumentTypeError(f"board {text!r} needs between 1 and {height * width - 1} mines")
+    return height, width, mines
+
+
+def play(game):
+    """
+    Plays one game, the AI making every move.
+    Returns (won, moves, playing time, times of each add_knowledge call).
+    """
+    height, width, mines, seed, verbose = game
+    # The board and the AI's random choices both come from the seed
+    random.seed(seed)
+    board = Minesweeper(height=height, width=width, mines=mines, seed=seed)
+    ai = MinesweeperAI(height=height, width=width, mines=mines, verbose=verbose)
+
+    inference = []
+    start = time.perf_counter()
+    won = False
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None or board.is_mine(move):
+            break
+        count = board.nearby_mines(move)
+        call = time.perf_counter()
+        ai.add_knowledge(move, count)
+        inference.append(time.perf_counter() - call)
+        if len(ai.moves_made) == height * width - mines:
+            won = True
+            break
+    return won, len(inference), time.perf_counter() - start, inference
+
+
+def report(height, width, mines, results, elapsed):
+    """
+    Prints the win rate, speed and add_knowledge times of a board's games.
+    """
+    games = len(results)
+    wins = sum(won for won, _, _, _ in results)
+    moves = sum(moves for _, moves, _, _ in results)
+    playing = sum(seconds for _, _, seconds, _ in results)
+    inference = sorted(seconds for _, _, _, times in results for seconds in times)
+    print(f"{height}x{width} with {mines} mines ({mines / (height * width):.1%} density): "
+          f"won {wins}/{games} ({wins / games:.1%}) in {elapsed:.1f}s")
+    print(f"    {moves / playing:,.0f} moves/s per worker, {moves / games:.1f} moves per game")
+    if len(inference) >= 2:
+        cuts = statistics.quantiles(inference, n=100, method="inclusive")
+        print(f"    add_knowledge: p50 {1000 * cuts[49]:.3f}ms, "
+              f"p99 {1000 * cuts[98]:.3f}ms, max {1000 * inference[-1]:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
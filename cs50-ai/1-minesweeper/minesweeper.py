@@ -1,6 +1,14 @@
 import itertools
 import random
-from copy import deepcopy
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    # Neighbor counts are then summed in pure Python
+    np = None
+
+import probability
 
 
 class Minesweeper():
@@ -8,28 +16,26 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, seed=None):
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Add mines randomly, from their own generator if given a seed,
+        # as distinct row-major cell indices
+        rng = random if seed is None else random.Random(seed)
+        indices = rng.sample(range(height * width), mines)
+        self.mines = set(map(divmod, indices, itertools.repeat(width)))
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Initialize the field, True where there is a mine
+        field = [False] * (height * width)
+        for index in indices:
+            field[index] = True
+        self.board = [field[i * width:(i + 1) * width] for i in range(height)]
+
+        # Number of mines around every cell, so nearby_mines is a lookup
+        self.counts = neighbor_counts(self.board)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -59,24 +65,8 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return self.counts[i][j]
 
     def won(self):
         """
@@ -85,19 +75,98 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+def neighbor_counts(board):
+    """
+    Returns a grid with the number of mines around each cell of a board,
+    not including the cell itself.
+    Sums shifted copies of the board with NumPy when it is installed,
+    otherwise sums each row's neighbors and then each column's neighboring rows.
+    """
+    height = len(board)
+    width = len(board[0]) if board else 0
+
+    if np is not None:
+        padded = np.zeros((height + 2, width + 2), dtype=np.int8)
+        padded[1:-1, 1:-1] = board
+        counts = sum(padded[di:di + height, dj:dj + width]
+                     for di in range(3) for dj in range(3))
+        return (counts - padded[1:-1, 1:-1]).tolist()
+
+    # Mines in each cell and its left and right neighbors
+    rows = []
+    for row in board:
+        padded = [False] + row + [False]
+        rows.append([a + b + c for a, b, c in zip(padded, padded[1:], padded[2:])])
+
+    zeros = [0] * width
+    counts = []
+    for i, row in enumerate(board):
+        above = rows[i - 1] if i > 0 else zeros
+        below = rows[i + 1] if i + 1 < height else zeros
+        counts.append([a + b + c - mine for a, b, c, mine
+                       in zip(above, rows[i], below, row)])
+    return counts
+
+
 class Sentence():
     """
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+    The cells are stored as the bits of an int, cell (i, j) being
+    bit i * width + j, so subsets, differences and marks are integer operations.
+    The AI gives its sentences the board's width, without one a sentence
+    uses the narrowest width that fits its cells.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, cells, count, width=None):
+        self.width = 1 if width is None else width
+        # Layout (bits, width) the cells' hash was last computed for
+        self.hashed_layout = None
+        self.cells_hash = None
+        self.cells = cells
         self.count = count
 
+    @classmethod
+    def from_bits(cls, bits, count, width):
+        """
+        Returns the sentence about the cells whose bits are set in bits.
+        """
+        sentence = cls((), count, width)
+        sentence.bits = bits
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        The set of cells (i, j) in the sentence.
+        """
+        return {divmod(index, self.width) for index in bit_indices(self.bits)}
+
+    @cells.setter
+    def cells(self, cells):
+        cells = list(cells)
+        # Widen the layout if a cell doesn't fit, which the AI's sentences never need
+        self.width = max([self.width] + [j + 1 for _, j in cells])
+        bits = 0
+        for i, j in cells:
+            bits |= 1 << (i * self.width + j)
+        self.bits = bits
+
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        if self.count != other.count:
+            return False
+        if self.width == other.width:
+            return self.bits == other.bits
+        return self.cells == other.cells
+
+    def __hash__(self):
+        # Sentences with different widths can be equal, so hash the cells,
+        # only working them out again once the bits or the width have changed
+        if self.hashed_layout != (self.bits, self.width):
+            self.hashed_layout = (self.bits, self.width)
+            self.cells_hash = hash(frozenset(self.cells))
+        return hash((self.cells_hash, self.count))
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
@@ -106,7 +175,7 @@ class Sentence():
         """
         Returns the set of all cells in self.cells known to be mines.
         """
-        if len(self.cells) == self.count:
+        if self.bits.bit_count() == self.count:
             return self.cells
         return None
 
@@ -123,34 +192,49 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
-        new_cells_set = self.cells
-        if cell in self.cells:
-            new_cells_set.remove(cell)
+        if cell[1] >= self.width:
+            return
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if self.bits & bit:
+            self.bits ^= bit
             self.count -= 1
-        self.cells = new_cells_set
-            
+
     def mark_safe(self, cell):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        new_cells_set = self.cells
-        if cell in self.cells:
-            new_cells_set.remove(cell)
-        self.cells = new_cells_set
-        
+        if cell[1] < self.width:
+            self.bits &= ~(1 << (cell[0] * self.width + cell[1]))
+
+
+def bit_indices(bits):
+    """
+    Yields the index of every bit set in bits, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
 
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, verbose=True):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Print the knowledge base and moves as the AI plays
+        self.verbose = verbose
+
+        # Number of mines on the board, if the AI is told
+        self.mine_count = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -161,14 +245,27 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # Index of the sentences each unidentified cell is in, by the cell's bit
+        # index (see Sentence): index -> {id: sentence}
+        self.cell_sentences = {}
+
+        # (bits, count) of every sentence in the KB, to avoid repeating them
+        self.sentence_keys = set()
+
+        # Sentences added or changed since inference last looked at them
+        self.pending = deque()
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        index = cell[0] * self.width + cell[1]
+        for sentence in self.cell_sentences.pop(index, {}).values():
+            self.forget_sentence(sentence)
             sentence.mark_mine(cell)
+            self.remember_sentence(sentence)
 
     def mark_safe(self, cell):
         """
@@ -176,8 +273,11 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        index = cell[0] * self.width + cell[1]
+        for sentence in self.cell_sentences.pop(index, {}).values():
+            self.forget_sentence(sentence)
             sentence.mark_safe(cell)
+            self.remember_sentence(sentence)
 
     def add_knowledge(self, cell, count):
         """
@@ -194,8 +294,6 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
-        print('-----------------------------------------------------------------')
-         
         # 1)
         self.moves_made.add(cell)
         
@@ -219,93 +317,111 @@ class MinesweeperAI():
                     if (i, j) in self.safes:
                         continue
                     new_cells_set.add((i, j))
-        new_sentence = Sentence(cells=new_cells_set, 
-                               count=count-counter_known_mines)
-        if new_sentence not in self.knowledge:
-            self.knowledge.append(new_sentence)
+        self.add_sentence(Sentence(cells=new_cells_set, count=count - counter_known_mines,
+                                   width=self.width))
         
-        # Repeat steps 4 and 5 while KB changes
-        while True:
-            # Save a copy of the KB to check if it changes after steps 4 and 5
-            copy_kb = deepcopy(self.knowledge)
-            
-            # 4)
+        # 4) and 5) for the new sentence and the sentences it changes
+        self.infer()
+        self.clean_kb()
+
+        if self.verbose:
+            print('-----------------------------------------------------------------')
             print('Printing KB:')
-            self.update_knowledge()
-            # 5)
-            self.compare_sentences()
-        
-            # Break the loop if the KB has not changed in this process
-            if copy_kb == self.knowledge:
-                break
-   
-        print(f'Known mines: {len(self.mines)}')
-        print(f'Known safes: {len(self.safes)}')
-        print(f'Remaining safe moves: {len(self.safes - self.moves_made)}')
-    
-    def clean_kb(self):
+            for sentence in self.knowledge:
+                print(f'\t{sentence}')
+            print(f'Known mines: {len(self.mines)}')
+            print(f'Known safes: {len(self.safes)}')
+            print(f'Remaining safe moves: {len(self.safes - self.moves_made)}')
+
+    def add_sentence(self, sentence):
         """
-        Removes repeating and empty sentences in the KB
+        Adds a sentence about unidentified cells to the KB and the index,
+        unless it is empty or already known, and queues it for inference.
         """
-        cleaned_kb = []
-        for sentence in self.knowledge:
-            if sentence not in cleaned_kb and len(sentence.cells) != 0:
-                cleaned_kb.append(sentence)
-        self.knowledge = cleaned_kb
-        
-    def compare_sentences(self):
+        self.knowledge.append(sentence)
+        for index in bit_indices(sentence.bits):
+            self.cell_sentences.setdefault(index, {})[id(sentence)] = sentence
+        self.remember_sentence(sentence)
+
+    def forget_sentence(self, sentence):
+        """
+        Removes the key of a sentence that is about to change.
+        """
+        self.sentence_keys.discard((sentence.bits, sentence.count))
+
+    def remember_sentence(self, sentence):
+        """
+        Stores the key of a new or changed sentence and queues it for inference.
+        A sentence that became empty or repeats another one is emptied and
+        taken out of the index, clean_kb drops it from the KB.
+        """
+        key = (sentence.bits, sentence.count)
+        if not sentence.bits or key in self.sentence_keys:
+            for index in bit_indices(sentence.bits):
+                self.cell_sentences[index].pop(id(sentence))
+            sentence.bits = 0
+            return
+        self.sentence_keys.add(key)
+        self.pending.append(sentence)
+
+    def infer(self):
         """
-        Compare sentences in the KB in pairs (permutations) checking if 
-        new knowledge can be infered.
-    
+        Worklist inference: takes sentences off the pending queue until it
+        is empty. A sentence whose cells are all mines or all safes marks them,
+        which changes and queues the other sentences they are in. Otherwise
+        it is compared with the sentences it shares a cell with, found through
+        the index, and if one's cells are a subset of the other's
+        the difference becomes a new sentence.
+
         --> sent_1's set of cells being a subset of sent_2's set of cells
         sent_1 => {(3, 4), (3, 6)} = 1
         sent_2 => {(5, 1), (3, 4), (3, 6)} = 2
         new_sent => {(5, 1)} = 1
-        
+
+        Every sentence is looked at again after its last change, so the KB
+        ends up with the same deductions as repeating both steps over the
+        whole KB until it stops changing.
         """
-        # Clean KB
-        self.clean_kb()
+        while self.pending:
+            sentence = self.pending.popleft()
+            # Emptied since it was queued
+            if not sentence.bits:
+                continue
+
+            # 4) as known_mines and known_safes, without turning bits into cells
+            bits = sentence.bits
+            if sentence.count == 0 or bits.bit_count() == sentence.count:
+                mark = self.mark_safe if sentence.count == 0 else self.mark_mine
+                for index in bit_indices(bits):
+                    mark(divmod(index, self.width))
+                continue
 
-        new_sentences = []
-        for sentences in itertools.permutations(self.knowledge[:], 2):
-            cells_1 = sentences[0].cells
-            cells_2 = sentences[1].cells
-            count_1 = sentences[0].count
-            count_2 = sentences[1].count
-            
-            if cells_1.issubset(cells_2):
-                new_sentences.append(Sentence(cells=cells_2 - cells_1, 
-                                              count=count_2 - count_1))
-                    
-        for new_sentence in new_sentences:
-            if new_sentence not in self.knowledge:
-                self.knowledge.append(new_sentence)
-    
-    def update_knowledge(self):
-        """
-        Loop through each sentence in the knowledge base to update the sentence
-        if possible, removing cells that have been already identified
-        """
-        mines_set = set()
-        safes_set = set()
-        
+            # 5)
+            others = {}
+            for index in bit_indices(bits):
+                others.update(self.cell_sentences[index])
+            others.pop(id(sentence))
+            for other in others.values():
+                # Same bits with a different count can only come from a wrong count
+                if bits == other.bits:
+                    continue
+                if bits & other.bits == bits:
+                    self.add_sentence(Sentence.from_bits(
+                        other.bits ^ bits, other.count - sentence.count, self.width))
+                elif bits & other.bits == other.bits:
+                    self.add_sentence(Sentence.from_bits(
+                        bits ^ other.bits, sentence.count - other.count, self.width))
+
+    def clean_kb(self):
+        """
+        Removes repeating and empty sentences in the KB
+        """
+        # Keyed by bits and count, all of the AI's sentences having its width
+        kept = {}
         for sentence in self.knowledge:
-            print(f'\t{sentence}')
-            # Check if cells in the sentence have been identified as mines
-            if sentence.known_mines():
-                for cell_in_set in sentence.known_mines():
-                    mines_set.add(cell_in_set)
-            # Check if cells in the sentence have been identified as safes
-            if sentence.known_safes():
-                for cell_in_set in sentence.known_safes():
-                    safes_set.add(cell_in_set)
-                    
-        # Update the KB                    
-        for cell_mine in mines_set:
-            self.mark_mine(cell_mine)
-        for cell_safe in safes_set:
-            self.mark_safe(cell_safe)
+            if sentence.bits:
+                kept.setdefault((sentence.bits, sentence.count), sentence)
+        self.knowledge = list(kept.values())
         
     def make_safe_move(self):
         """
@@ -330,21 +446,48 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        the one least likely to be a mine given the knowledge base and,
+        if the AI was told, the number of mines (see probability.py).
+        Ties go to the cell with the fewest unknown neighbors, which is the
+        most likely to reveal a 0, then are broken randomly.
         """
         # Save all possible moves in a set
         possible_moves = set()
-        for i in range(0, self.height-1):
-            for j in range(0, self.width-1):
+        for i in range(self.height):
+            for j in range(self.width):
                 if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                    possible_moves.add((i, j))            
+                    possible_moves.add((i, j))
         # If no possible moves return None
         if len(possible_moves) == 0:
             return None
-        # Return a random possible move
-        move = random.choice(sorted(possible_moves))
-        print(f'AI about to make random move: {move}')
+
+        unknown = {i * self.width + j for i, j in possible_moves - self.safes}
+        mines_left = None
+        if self.mine_count is not None:
+            mines_left = self.mine_count - len(self.mines)
+        probabilities = probability.mine_probabilities(
+            [(sentence.bits, sentence.count) for sentence in self.knowledge],
+            unknown, mines_left)
+
+        def risk(cell):
+            i, j = cell
+            if cell in self.safes:
+                return (0, 0)
+            unknown_neighbors = sum(
+                (a, b) not in self.moves_made and (a, b) not in self.mines
+                for a in range(max(0, i - 1), min(self.height, i + 2))
+                for b in range(max(0, j - 1), min(self.width, j + 2))
+            )
+            # Rounded so that equal probabilities computed differently tie
+            return (round(probabilities[i * self.width + j], 9), unknown_neighbors)
+
+        risks = {cell: risk(cell) for cell in possible_moves}
+        lowest = min(risks.values())
+        move = random.choice(sorted(cell for cell in risks if risks[cell] == lowest))
+        if self.verbose:
+            print(f'AI about to make random move: {move}, '
+                  f'mine probability {lowest[0]:.3f}')
         return move
-        
@@ -0,0 +1,256 @@
+"""
+Mine probabilities of unknown Minesweeper cells, from the AI's knowledge
+"""
+
+import random
+from math import comb
+
+# Assignments tried to enumerate the configurations of one component exactly
+ENUMERATION_LIMIT = 50_000
+
+# Configurations sampled instead when a component has too many
+SAMPLES = 200
+
+# Assignments tried to find each sampled configuration
+SAMPLE_LIMIT = 5_000
+
+
+class LimitReached(Exception):
+    pass
+
+
+def mine_probabilities(sentences, unknown, mines_left=None, rng=random):
+    """
+    Returns a dictionary mapping every cell in unknown to the probability
+    that it is a mine. Cells are bit indices, as in Sentence.
+
+    sentences: (bits, count) of every sentence in the knowledge base, all
+        about unknown cells.
+    unknown: set of the cells not known to be mines or safes.
+    mines_left: number of mines on the board not known yet, None if unknown.
+
+    Cells in sentences (the frontier) are split into components that share
+    no sentence, and the mine configurations consistent with each component's
+    sentences are enumerated, or sampled if there are too many. Each way of
+    combining the components is weighted by the ways to place the mines left
+    in the cells outside the frontier, so every consistent placement of all
+    the mines is equally likely.
+    Without mines_left every configuration counts once and cells outside the
+    frontier get the average probability of the frontier.
+    """
+    results = [enumerate_component(cells, constraints, rng)
+               for cells, constraints in components(sentences)]
+    frontier = [cell for cells, _ in results for cell in cells]
+    interior = len(unknown) - len(frontier)
+
+    def weight(mines):
+        # Ways to place the rest of the mines outside the frontier
+        if mines_left is None:
+            return 1
+        rest = mines_left - mines
+        return comb(interior, rest) if 0 <= rest <= interior else 0
+
+    # Distribution of the number of mines in the whole frontier, and in the
+    # frontier without each component
+    total = {0: 1}
+    for _, counts in results:
+        total = convolve(total, {mines: solutions for mines, (solutions, _) in counts.items()})
+    norm = sum(ways * weight(mines) for mines, ways in total.items())
+    if norm == 0:
+        if mines_left is not None:
+            # The knowledge contradicts mines_left, fall back to not using it
+            return mine_probabilities(sentences, unknown, None, rng)
+        # The knowledge contradicts itself, give every cell the average
+        # density of the sentences, like enumerate_component does
+        cells = sum(bits.bit_count() for bits, _ in sentences)
+        density = sum(count for _, count in sentences) / cells if cells else 0.5
+        return {cell: min(max(density, 0.0), 1.0) for cell in unknown}
+
+    probabilities = {}
+    for k, (cells, counts) in enumerate(results):
+        others = {0: 1}
+        for other, (_, other_counts) in enumerate(results):
+            if other != k:
+                others = convolve(others, {mines: solutions for mines, (solutions, _)
+                                           in other_counts.items()})
+        mine_ways = [0] * len(cells)
+        for mines, (_, cell_counts) in counts.items():
+            rest = sum(ways * weight(mines + other_mines)
+                       for other_mines, ways in others.items())
+            for i, count in enumerate(cell_counts):
+                mine_ways[i] += count * rest
+        for cell, ways in zip(cells, mine_ways):
+            probabilities[cell] = ways / norm
+
+    if interior:
+        if mines_left is None:
+            probability = (sum(probabilities.values()) / len(probabilities)
+                           if probabilities else 0.5)
+        else:
+            # Each placement of the rest of the mines puts one on a given
+            # interior cell in comb(interior - 1, rest - 1) ways
+            probability = sum(
+                ways * comb(interior - 1, mines_left - mines - 1)
+                for mines, ways in total.items() if 0 < mines_left - mines <= interior
+            ) / norm
+        for cell in unknown:
+            if cell not in probabilities:
+                probabilities[cell] = probability
+    return probabilities
+
+
+def components(sentences):
+    """
+    Splits sentences into groups that share no cell.
+    Returns a list of (cells, constraints): the cells of a group, ordered so
+    that the cells of each sentence are close together, and its sentences
+    as (count, positions of their cells in cells).
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    sentence_cells = []
+    for bits, count in sentences:
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(low.bit_length() - 1)
+            bits ^= low
+        sentence_cells.append((cells, count))
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        for cell in cells[1:]:
+            parent[find(cell)] = find(cells[0])
+
+    groups = {}
+    for cells, count in sentence_cells:
+        if cells:
+            groups.setdefault(find(cells[0]), []).append((cells, count))
+
+    result = []
+    for group in groups.values():
+        positions = {}
+        for cells, _ in group:
+            for cell in cells:
+                positions.setdefault(cell, len(positions))
+        constraints = [(count, [positions[cell] for cell in cells]) for cells, count in group]
+        result.append((list(positions), constraints))
+    return result
+
+
+def enumerate_component(cells, constraints, rng=random):
+    """
+    Finds the mine configurations of a component's cells consistent with
+    its constraints, see components.
+    Returns (cells, counts), counts mapping each number of mines to
+    (solutions, cell_counts): how many configurations have that many mines,
+    and in how many of them each cell is a mine.
+    Components with more configurations than ENUMERATION_LIMIT allows are
+    sampled instead, and the counts are then sample frequencies.
+    """
+    try:
+        return cells, backtrack(cells, constraints, ENUMERATION_LIMIT)
+    except LimitReached:
+        pass
+    counts = {}
+    for _ in range(SAMPLES):
+        try:
+            sample = backtrack(cells, constraints, SAMPLE_LIMIT, rng)
+        except LimitReached:
+            continue
+        for mines, (solutions, cell_counts) in sample.items():
+            total, total_cells = counts.setdefault(mines, [0, [0] * len(cells)])
+            counts[mines][0] = total + solutions
+            for i, count in enumerate(cell_counts):
+                total_cells[i] += count
+    if not counts:
+        # Not even a sample, give every cell the average density of its sentences
+        density = sum(count for count, _ in constraints) / sum(
+            len(positions) for _, positions in constraints)
+        mines = round(density * len(cells))
+        counts = {mines: [100, [round(100 * density)] * len(cells)]}
+    return cells, {mines: tuple(value) for mines, value in counts.items()}
+
+
+def backtrack(cells, constraints, limit, rng=None):
+    """
+    Depth-first search over mine (1) or safe (0) assignments of the cells
+    in order, undoing an assignment as soon as a constraint can't be met.
+    Counts every configuration found, see enumerate_component, or only the
+    first one when rng is given, trying values in random order.
+    Raises LimitReached after limit assignments.
+    """
+    n = len(cells)
+    needed = [count for count, _ in constraints]
+    free = [len(positions) for _, positions in constraints]
+    cell_constraints = [[] for _ in range(n)]
+    for c, (_, positions) in enumerate(constraints):
+        for position in positions:
+            cell_constraints[position].append(c)
+
+    counts = {}
+    values = [None] * n
+    tried = [0] * n
+    first = [0] * n
+    mines = 0
+    steps = 0
+    k = 0
+    while k >= 0:
+        if k == n:
+            solutions, cell_counts = counts.setdefault(mines, [0, [0] * n])
+            counts[mines][0] = solutions + 1
+            for i, value in enumerate(values):
+                cell_counts[i] += value
+            if rng is not None:
+                break
+            k -= 1
+            continue
+
+        # Undo the value tried last at this cell
+        if values[k] is not None:
+            for c in cell_constraints[k]:
+                free[c] += 1
+                needed[c] += values[k]
+            mines -= values[k]
+            values[k] = None
+        if tried[k] == 2:
+            tried[k] = 0
+            k -= 1
+            continue
+        if tried[k] == 0:
+            first[k] = rng.randrange(2) if rng is not None else 0
+        value = first[k] ^ tried[k]
+        tried[k] += 1
+
+        steps += 1
+        if steps > limit:
+            raise LimitReached
+        values[k] = value
+        mines += value
+        consistent = True
+        for c in cell_constraints[k]:
+            free[c] -= 1
+            needed[c] -= value
+            if needed[c] < 0 or needed[c] > free[c]:
+                consistent = False
+        if consistent:
+            k += 1
+
+    return {mines: tuple(value) for mines, value in counts.items()}
+
+
+def convolve(a, b):
+    """
+    Returns the distribution of the sum of two independent counts,
+    each given as a dictionary mapping values to numbers of ways.
+    """
+    result = {}
+    for x, ways_x in a.items():
+        for y, ways_y in b.items():
+            result[x + y] = result.get(x + y, 0) + ways_x * ways_y
+    return result
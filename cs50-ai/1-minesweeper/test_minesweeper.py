@@ -0,0 +1,70 @@
+import random
+
+from minesweeper import Minesweeper, MinesweeperAI, Sentence
+
+
+def test_sentence_without_width():
+    sentence = Sentence({(0, 0), (0, 1), (1, 1)}, 3)
+    assert sentence.cells == {(0, 0), (0, 1), (1, 1)}
+    assert sentence.known_mines() == {(0, 0), (0, 1), (1, 1)}
+    assert not sentence.known_safes()
+
+    # Cells past the sentence's width aren't in it, and mustn't alias one that is
+    sentence.mark_mine((0, 3))
+    sentence.mark_safe((0, 2))
+    assert sentence.cells == {(0, 0), (0, 1), (1, 1)}
+    assert sentence.count == 3
+
+    sentence.mark_mine((1, 1))
+    sentence.mark_safe((0, 0))
+    assert sentence.cells == {(0, 1)}
+    assert sentence.count == 2
+
+
+def test_sentence_cells_can_be_assigned():
+    sentence = Sentence({(2, 2)}, 1, width=8)
+    sentence.cells = {(3, 4), (3, 6)}
+    assert sentence.cells == {(3, 4), (3, 6)}
+    assert sentence.width == 8
+    sentence.mark_safe((3, 4))
+    assert sentence.known_mines() == {(3, 6)}
+
+    # A cell wider than the sentence's layout widens it
+    sentence.cells = {(1, 1), (0, 9)}
+    assert sentence.cells == {(1, 1), (0, 9)}
+
+
+def test_sentences_compare_by_cells_and_count():
+    narrow = Sentence({(1, 0)}, 1)
+    wide = Sentence({(1, 0), (0, 3)}, 1)
+    wide.mark_safe((0, 3))
+    assert narrow.width != wide.width
+    assert narrow == wide
+    assert hash(narrow) == hash(wide)
+    assert len({narrow, wide, Sentence({(1, 0)}, 1, width=8)}) == 1
+    assert narrow != Sentence({(1, 0)}, 0)
+
+    # The hash follows the sentence as its cells and count change
+    narrow.mark_mine((1, 0))
+    assert hash(narrow) == hash(Sentence(set(), 0, width=8))
+    narrow.cells = {(0, 1)}
+    narrow.count = 1
+    assert hash(narrow) == hash(Sentence({(0, 1)}, 1, width=8))
+
+
+def test_ai_never_loses_on_its_safe_moves():
+    for seed in range(20):
+        random.seed(seed)
+        game = Minesweeper(height=8, width=8, mines=8, seed=seed)
+        ai = MinesweeperAI(height=8, width=8, mines=8, verbose=False)
+        while True:
+            move = ai.make_safe_move()
+            if move is None:
+                move = ai.make_random_move()
+                if move is None or game.is_mine(move):
+                    break
+            else:
+                assert not game.is_mine(move)
+            ai.add_knowledge(move, game.nearby_mines(move))
+            assert ai.mines <= game.mines
+            assert len(ai.knowledge) == len(set(ai.knowledge))
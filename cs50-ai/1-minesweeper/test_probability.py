@@ -0,0 +1,22 @@
+import pytest
+
+from probability import mine_probabilities
+
+
+def test_one_sentence_spreads_its_mines_evenly():
+    probabilities = mine_probabilities([(0b111, 1)], {0, 1, 2})
+    assert probabilities == pytest.approx({0: 1 / 3, 1: 1 / 3, 2: 1 / 3})
+
+
+def test_mines_left_weighs_the_cells_outside_the_frontier():
+    # Cells 0 and 1 hold one mine, so the other mine is one of cells 2 to 4
+    probabilities = mine_probabilities([(0b11, 1)], set(range(5)), mines_left=2)
+    assert probabilities == pytest.approx({0: 1 / 2, 1: 1 / 2, 2: 1 / 3, 3: 1 / 3, 4: 1 / 3})
+
+
+@pytest.mark.parametrize("mines_left", [None, 1, 5])
+def test_contradictory_knowledge_still_has_an_answer(mines_left):
+    # Two cells can't hold three mines
+    probabilities = mine_probabilities([(0b11, 3)], {0, 1, 2}, mines_left)
+    assert set(probabilities) == {0, 1, 2}
+    assert all(0 <= probability <= 1 for probability in probabilities.values())